@@ -0,0 +1,4 @@
+from backtester.data import BookSnapshot, DayData, load_days
+from backtester.engine import Backtester, BacktestResult, LIMITS, trader_factory
+from backtester.fills import QueueFillModel
+from backtester.stream import Tick, stream_days
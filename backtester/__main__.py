@@ -0,0 +1,65 @@
+import argparse
+import cProfile
+import os
+import sys
+
+
+def main(argv=None):
+    # make round files and datamodel importable when run from another directory
+    sys.path.insert(0, os.getcwd())
+    from backtester.data import load_days
+    from backtester.engine import Backtester, trader_factory
+    from backtester.fills import QueueFillModel
+    from backtester.profiler import SpanProfiler
+    from backtester.store import is_store, load_store
+    from backtester.stream import stream_days
+
+    parser = argparse.ArgumentParser(prog='python -m backtester',
+                                     description='Replay Prosperity csv data through Trader.run')
+    parser.add_argument('trader', help='trader module or file, e.g. round_5')
+    parser.add_argument('data_dir', help='directory with prices, trades and observations csv files, or tick store')
+    parser.add_argument('--days', type=int, nargs='+', help='days to replay, default all')
+    parser.add_argument('--stream', action='store_true',
+                        help='parse csv files tick by tick while replaying instead of loading whole days first')
+    parser.add_argument('--queue-fills', type=float, metavar='FRACTION', nargs='?', const=1.0,
+                        help='fill quotes resting after crossing from market trades behind FRACTION of the visible '
+                             'queue at their price, default 1.0 when given without value')
+    parser.add_argument('--profile', action='store_true',
+                        help='time constructors and methods of the trader classes and print spans after the run')
+    parser.add_argument('--flamegraph', help='write folded stacks of the spans to this file, implies --profile')
+    parser.add_argument('--cprofile', help='write cProfile stats of the whole run to this file')
+    parser.add_argument('--print', dest='print_output', action='store_true', help='print trader output')
+    args = parser.parse_args(argv)
+
+    profiler = SpanProfiler() if args.profile or args.flamegraph else None
+    factory = trader_factory(args.trader, instrument=profiler.instrument if profiler else None)
+    fill_model = None if args.queue_fills is None else QueueFillModel(args.queue_fills)
+    backtester = Backtester(factory, print_output=args.print_output, fill_model=fill_model)
+    if is_store(args.data_dir):
+        days = load_store(args.data_dir, args.days)
+    elif args.stream:
+        days = None
+    else:
+        days = load_days(args.data_dir, args.days)
+
+    def run():
+        if days is None:
+            return backtester.run_stream(stream_days(args.data_dir, args.days))
+        return backtester.run(days)
+
+    if args.cprofile:
+        with cProfile.Profile() as profile:
+            result = run()
+        profile.dump_stats(args.cprofile)
+    else:
+        result = run()
+    print(result.summary())
+    if profiler:
+        profiler.close()
+        print('\n' + profiler.report())
+        if args.flamegraph:
+            profiler.dump_folded(args.flamegraph)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+import os
+import re
+from typing import List, Dict, Tuple, Iterator, Optional
+
+from datamodel import Symbol, Product
+from backtester.models import Trade, ConversionObservation
+
+# price levels of a single side: ((price, volume), ...) ordered from best to worst
+Levels = Tuple[Tuple[int, int], ...]
+
+PRICES_FILE = re.compile(r"prices_round_(\d+)_day_(-?\d+)\.csv$")
+TRADES_FILE = re.compile(r"trades_round_(\d+)_day_(-?\d+)(?:_(\w+))?\.csv$")
+OBSERVATIONS_FILE = re.compile(r"observations_round_(\d+)_day_(-?\d+)\.csv$")
+
+# observation csv headers differ between official data and community tools
+OBSERVATION_COLUMNS = {'bidPrice': ('bidPrice', 'ORCHIDS'),
+                       'askPrice': ('askPrice',),
+                       'transportFees': ('transportFees', 'TRANSPORT_FEES'),
+                       'exportTariff': ('exportTariff', 'EXPORT_TARIFF'),
+                       'importTariff': ('importTariff', 'IMPORT_TARIFF'),
+                       'sunlight': ('sunlight', 'SUNLIGHT'),
+                       'humidity': ('humidity', 'HUMIDITY')}
+
+
+class BookSnapshot:
+    """
+    Immutable snapshot of order book levels of a symbol at a timestamp
+    """
+    __slots__ = ('bids', 'asks', 'mid_price')
+
+    def __init__(self, bids: Levels, asks: Levels, mid_price: float):
+        self.bids = bids  # bid levels with positive volume, highest price first
+        self.asks = asks  # ask levels with negative volume (exchange convention), lowest price first
+        self.mid_price = mid_price
+
+
+class DayData:
+    """
+    Historical market data of a single day, indexed by timestamp
+    """
+    def __init__(self, day: int):
+        self.day = day
+        self.timestamps: List[int] = []
+        self.books: Dict[int, Dict[Symbol, BookSnapshot]] = {}
+        self.trades: Dict[int, Dict[Symbol, List[Trade]]] = {}
+        self.observations: Dict[int, Dict[Product, ConversionObservation]] = {}
+        self.symbols: List[Symbol] = []
+
+    def __repr__(self) -> str:
+        return f"DayData(day={self.day}, ticks={len(self.timestamps)}, symbols={self.symbols})"
+
+
+def parse_levels(row: List[str], start: int, sign: int) -> Levels:
+    """
+    Parse up to three (price, volume) levels from a row of the prices csv
+
+    :param row: (List[str]) Split row of the prices csv
+    :param start: (int) Column index of the first price of the side
+    :param sign: (int) Sign applied to volumes, -1 for asks
+    :return: (Levels) Tuple of (price, volume) pairs
+    """
+    levels = []
+    for i in (start, start + 2, start + 4):
+        if row[i]:
+            levels.append((int(row[i]), sign * int(row[i + 1])))
+    return tuple(levels)
+
+
+def iter_prices(path: str) -> Iterator[Tuple[int, Symbol, BookSnapshot]]:
+    """
+    Lazily parse semicolon-delimited prices csv into book snapshots, in file order.\n
+    Columns: day;timestamp;product;bid_price_1;bid_volume_1;...;ask_price_3;ask_volume_3;mid_price;profit_and_loss
+
+    :param path: (str) Path of the prices csv
+    :return: (Iterator[Tuple[int, Symbol, BookSnapshot]]) Timestamp, symbol and book snapshot of each row
+    """
+    with open(path) as f:
+        next(f)  # skip header
+        for line in f:
+            row = line.rstrip('\n').split(';')
+            if len(row) < 16:
+                continue
+            yield int(row[1]), row[2], BookSnapshot(parse_levels(row, 3, 1), parse_levels(row, 9, -1),
+                                                    float(row[15]) if row[15] else 0.0)
+
+
+def iter_trades(path: str) -> Iterator[Tuple[int, Trade]]:
+    """
+    Lazily parse semicolon-delimited market trades csv, in file order.\n
+    Columns: timestamp;buyer;seller;symbol;currency;price;quantity
+
+    :param path: (str) Path of the trades csv
+    :return: (Iterator[Tuple[int, Trade]]) Timestamp and trade of each row
+    """
+    with open(path) as f:
+        next(f)
+        for line in f:
+            row = line.rstrip('\n').split(';')
+            if len(row) < 7:
+                continue
+            timestamp = int(row[0])
+            yield timestamp, Trade(row[3], int(float(row[5])), int(row[6]), row[1], row[2], timestamp)
+
+
+def iter_observations(path: str) -> Iterator[Tuple[int, ConversionObservation]]:
+    """
+    Lazily parse comma-delimited conversion observations csv, in file order
+
+    :param path: (str) Path of the observations csv
+    :return: (Iterator[Tuple[int, ConversionObservation]]) Timestamp and observation of each row
+    """
+    with open(path) as f:
+        header = next(f).strip().split(',')
+        index = {}
+        for field, aliases in OBSERVATION_COLUMNS.items():
+            index[field] = next((header.index(a) for a in aliases if a in header), None)
+        for line in f:
+            row = line.strip().split(',')
+            if len(row) < len(header):
+                continue
+            values = {field: float(row[i]) if i is not None else 0.0 for field, i in index.items()}
+            yield int(row[0]), ConversionObservation(**values)
+
+
+def read_prices(path: str, day_data: DayData):
+    """
+    Read prices csv into book snapshots of a day
+
+    :param path: (str) Path of the prices csv
+    :param day_data: (DayData) Day data to fill
+    """
+    books = day_data.books
+    symbols = set(day_data.symbols)
+    for timestamp, symbol, book in iter_prices(path):
+        tick = books.get(timestamp)
+        if tick is None:
+            tick = books[timestamp] = {}
+        if symbol in tick:
+            continue  # first file providing the symbol wins
+        tick[symbol] = book
+        symbols.add(symbol)
+    day_data.symbols = sorted(symbols)
+
+
+def read_trades(path: str, day_data: DayData):
+    """
+    Read market trades csv of a day
+
+    :param path: (str) Path of the trades csv
+    :param day_data: (DayData) Day data to fill
+    """
+    trades = day_data.trades
+    for timestamp, trade in iter_trades(path):
+        trades.setdefault(timestamp, {}).setdefault(trade.symbol, []).append(trade)
+
+
+def read_observations(path: str, day_data: DayData, product: Product = 'ORCHIDS'):
+    """
+    Read conversion observations csv of a product
+
+    :param path: (str) Path of the observations csv
+    :param day_data: (DayData) Day data to fill
+    :param product: (Product) Product which can be converted with the observation
+    """
+    observations = day_data.observations
+    for timestamp, observation in iter_observations(path):
+        observations.setdefault(timestamp, {})[product] = observation
+
+
+def discover_days(data_dir: str) -> Dict[int, Dict[str, List[str]]]:
+    """
+    Group data files of a directory by day across all rounds
+
+    :param data_dir: (str) Directory containing Prosperity csv files
+    :return: (Dict[int, Dict[str, List[str]]]) Day to file kind ('prices', 'trades', 'observations') to paths
+    """
+    days: Dict[int, Dict[str, List[str]]] = {}
+    trades_by_round: Dict[Tuple[int, int], List[Tuple[str, str]]] = {}
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, name)
+        if match := PRICES_FILE.search(name):
+            days.setdefault(int(match.group(2)), {}).setdefault('prices', []).append(path)
+        elif match := OBSERVATIONS_FILE.search(name):
+            days.setdefault(int(match.group(2)), {}).setdefault('observations', []).append(path)
+        elif match := TRADES_FILE.search(name):
+            key = (int(match.group(1)), int(match.group(2)))
+            trades_by_round.setdefault(key, []).append((match.group(3) or '', path))
+
+    # a round may ship both anonymized (nn) and de-anonymized (wn) trades, keep only one of them
+    for (_, day), files in trades_by_round.items():
+        files.sort(key=lambda f: f[0] != 'wn')
+        days.setdefault(day, {}).setdefault('trades', []).append(files[0][1])
+    return days
+
+
+def load_days(data_dir: str, days: Optional[List[int]] = None) -> List[DayData]:
+    """
+    Load price, trade and observation files of a directory merged by day
+
+    :param data_dir: (str) Directory containing Prosperity csv files
+    :param days: (List[int]) Days to load, default all days found
+    :return: (List[DayData]) Loaded data sorted by day
+    """
+    files = discover_days(data_dir)
+    if days is None:
+        days = sorted(d for d, kinds in files.items() if 'prices' in kinds)
+
+    result = []
+    for day in days:
+        if day not in files or 'prices' not in files[day]:
+            raise FileNotFoundError(f"No prices csv for day {day} in {data_dir}")
+        day_data = DayData(day)
+        for path in files[day]['prices']:
+            read_prices(path, day_data)
+        for path in files[day].get('trades', []):
+            read_trades(path, day_data)
+        for path in files[day].get('observations', []):
+            read_observations(path, day_data)
+        day_data.timestamps = sorted(day_data.books)
+        result.append(day_data)
+    return result
@@ -0,0 +1,339 @@
+import importlib
+import os
+import time
+from contextlib import redirect_stdout
+from typing import List, Dict, Tuple, Iterable, Iterator, Callable, Union, Any
+
+from datamodel import TradingState, Symbol, Product, Position, UserId
+from backtester.data import DayData, BookSnapshot
+from backtester.models import Listing, Observation, ConversionObservation, Order, OrderDepth, Trade
+from backtester.packed import PackedDay
+from backtester.stream import Tick, loaded_days
+
+# position limits enforced by the exchange
+LIMITS: Dict[Product, Position] = {'AMETHYSTS': 20,
+                                   'STARFRUIT': 20,
+                                   'ORCHIDS': 100,
+                                   'GIFT_BASKET': 60,
+                                   'CHOCOLATE': 250,
+                                   'STRAWBERRIES': 350,
+                                   'ROSES': 60,
+                                   'COCONUT': 300,
+                                   'COCONUT_COUPON': 600}
+
+# storage cost per unit of long position per timestamp for convertible products
+STORAGE_COST: Dict[Product, float] = {'ORCHIDS': 0.1}
+
+SUBMISSION: UserId = 'SUBMISSION'
+
+
+def trader_factory(module_name: str, overrides: Dict[str, Dict[str, Any]] = None,
+                   instrument: Callable[[Any], None] = None) -> Callable[[], Any]:
+    """
+    Build a factory creating a fresh Trader of a round module.\n
+    The module is reloaded for every trader as class variables of Trader hold state across timestamps.
+    Overrides are applied to Trader.config['STRATEGY'] after each reload, then Trader.configure is called if
+    defined to rebuild state derived from the config when the class was defined, e.g. basket premium priors.
+
+    :param module_name: (str) Module name or path of the trader file, e.g. round_5 or round_5.py
+    :param overrides: (Dict[str, Dict[str, Any]]) Strategy config values to override by product and key
+    :param instrument: (Callable[[module], None]) Called with the reloaded module before the trader is built,
+        e.g. SpanProfiler.instrument
+    :return: (Callable[[], Any]) Factory returning a new Trader instance
+    """
+    module_name = os.path.splitext(os.path.basename(module_name))[0]
+    module = importlib.import_module(module_name)
+
+    def factory():
+        reloaded = importlib.reload(module)
+        if instrument:
+            instrument(reloaded)
+        trader_class = reloaded.Trader
+        for product, values in (overrides or {}).items():
+            trader_class.config['STRATEGY'][product].update(values)
+        if overrides and hasattr(trader_class, 'configure'):
+            trader_class.configure()
+        return trader_class()
+    return factory
+
+
+class BacktestResult:
+    """
+    Profit and loss and execution statistics of a backtest
+    """
+    def __init__(self):
+        self.day_pnl: Dict[int, Dict[Symbol, float]] = {}  # mark-to-market PnL at the end of each day
+        self.pnl_history: List[Tuple[int, int, float]] = []  # (day, timestamp, total PnL)
+        self.own_trades: int = 0
+        self.passive_trades: int = 0  # own trades filled by the fill model from market trades
+        self.rejected: Dict[int, Dict[Symbol, int]] = {}  # order sets rejected for breaking position limit per day
+        self.ticks: int = 0
+        self.elapsed: float = 0.0
+
+    @property
+    def total_pnl(self) -> float:
+        return sum(sum(pnl.values()) for pnl in self.day_pnl.values())
+
+    def summary(self) -> str:
+        """
+        Build a text table of PnL per day and symbol
+
+        :return: (str) Printable summary of the backtest
+        """
+        lines = []
+        for day, pnl in self.day_pnl.items():
+            lines.append(f"Day {day}")
+            day_rejected = self.rejected.get(day, {})
+            for symbol, value in pnl.items():
+                rejected = f" ({day_rejected[symbol]} rejected)" if day_rejected.get(symbol) else ""
+                lines.append(f"  {symbol:<16}{value:>14,.1f}{rejected}")
+            lines.append(f"  {'Total':<16}{sum(pnl.values()):>14,.1f}")
+        passive = f" ({self.passive_trades} passive)" if self.passive_trades else ""
+        lines.append(f"Total PnL {self.total_pnl:,.1f} over {self.ticks} ticks, "
+                     f"{self.own_trades} own trades{passive} in {self.elapsed:.2f}s")
+        return '\n'.join(lines)
+
+
+class Backtester:
+    """
+    Turn-based matching engine replaying historical order books through Trader.run\n
+    Orders are matched against the visible order depth of the timestamp, and any unfilled
+    quantity is cancelled before the next timestamp as in the exchange.\n
+    Order sets of a symbol which could break the position limit if fully filled are rejected as a whole.\n
+    With a fill model, e.g. QueueFillModel, quantity left after crossing rests for the timestamp and is filled
+    from the market trades of the timestamp.
+    """
+    def __init__(self, trader_factory: Callable[[], Any], limits: Dict[Product, Position] = None,
+                 print_output: bool = False, fill_model: Any = None):
+        self.trader_factory = trader_factory  # called once per day for a fresh trader
+        self.limits = limits or LIMITS
+        self.print_output = print_output  # print logs of the trader instead of discarding them
+        self.fill_model = fill_model  # passive fills of resting quotes, None to only cross the visible book
+
+    def run(self, days: Iterable[Union[DayData, PackedDay]]) -> BacktestResult:
+        """
+        Replay every day independently starting from flat position
+
+        :param days: (Iterable[DayData | PackedDay]) Market data of days to replay, consumed lazily
+        :return: (BacktestResult) Result of the backtest
+        """
+        return self.run_stream(loaded_days(days))
+
+    def run_stream(self, days: Iterable[Tuple[int, Iterable[Tick]]]) -> BacktestResult:
+        """
+        Replay days given as tick streams, e.g. from stream_days, so that only the current tick is held in memory
+
+        :param days: (Iterable[Tuple[int, Iterable[Tick]]]) Day and its ticks in timestamp order
+        :return: (BacktestResult) Result of the backtest
+        """
+        result = BacktestResult()
+        start = time.perf_counter()
+        if self.print_output:
+            for day, ticks in days:
+                self.run_day(day, ticks, result)
+        else:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                for day, ticks in days:
+                    self.run_day(day, ticks, result)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def run_day(self, day: int, ticks: Iterable[Tick], result: BacktestResult):
+        """
+        Replay a single day tick by tick
+
+        :param day: (int) Day of the ticks
+        :param ticks: (Iterable[Tick]) Ticks of the day in timestamp order
+        :param result: (BacktestResult) Result to accumulate
+        """
+        for _ in self.replay(day, ticks, result):
+            pass
+
+    def replay(self, day: int, ticks: Iterable[Tick], result: BacktestResult
+               ) -> Iterator[Tuple[int, Dict[Symbol, List[Trade]]]]:
+        """
+        Lazily replay ticks of a day through a fresh trader, yielding own trades as each tick is matched.\n
+        Each tick is turned into a TradingState only when reached and nothing of it is kept once the next
+        tick is pulled, except the trades shown to the trader in the next state.
+        The PnL of the day is recorded in the result once the ticks are exhausted.
+
+        :param day: (int) Day of the ticks
+        :param ticks: (Iterable[Tick]) Ticks of the day in timestamp order
+        :param result: (BacktestResult) Result to accumulate
+        :return: (Iterator[Tuple[int, Dict[Symbol, List[Trade]]]]) Timestamp and own trades of each tick
+        """
+        trader = self.trader_factory()
+        listings: Dict[Symbol, Listing] = {}
+        position: Dict[Product, Position] = {}
+        cash: Dict[Symbol, float] = {}
+        last_mid: Dict[Symbol, float] = {}
+        own_trades: Dict[Symbol, List[Trade]] = {}
+        market_trades: Dict[Symbol, List[Trade]] = {}
+        trader_data = ""
+        rejected = result.rejected.setdefault(day, {})
+
+        for tick in ticks:
+            timestamp = tick.timestamp
+            books = tick.books
+            for symbol in books:
+                if symbol not in listings:  # symbols are listed from their first quote
+                    listings[symbol] = Listing(symbol, symbol, 'SEASHELLS')
+                    cash[symbol] = 0.0
+            order_depths = {symbol: self.order_depth(book) for symbol, book in books.items()}
+            state = TradingState(trader_data, timestamp, listings, order_depths, own_trades, market_trades,
+                                 dict(position), Observation({}, dict(tick.observations)))
+
+            orders, conversions, trader_data = trader.run(state)
+
+            own_trades = {}
+            for symbol, symbol_orders in orders.items():
+                if not symbol_orders or symbol not in books:
+                    continue
+                if not self.within_limit(symbol, symbol_orders, position.get(symbol, 0)):
+                    rejected[symbol] = rejected.get(symbol, 0) + 1
+                    continue
+                resting = [] if self.fill_model else None
+                trades = self.match_orders(timestamp, symbol_orders, books[symbol], position, cash, resting)
+                if resting:
+                    passive = self.fill_model.fill(timestamp, symbol, resting, books[symbol],
+                                                   tick.trades.get(symbol, []), position, cash)
+                    trades += passive
+                    result.passive_trades += len(passive)
+                if trades:
+                    own_trades[symbol] = trades
+                    result.own_trades += len(trades)
+
+            if conversions:
+                self.convert(conversions, tick.observations, position, cash)
+            for product, cost in STORAGE_COST.items():
+                if position.get(product, 0) > 0:
+                    cash[product] -= position[product] * cost
+
+            # trades of this timestamp are shown to the trader in the next state
+            market_trades = tick.trades
+            for symbol, book in books.items():
+                last_mid[symbol] = book.mid_price
+            result.pnl_history.append((day, timestamp, self.mark_to_market(position, cash, last_mid)))
+            result.ticks += 1
+            yield timestamp, own_trades
+
+        result.day_pnl[day] = {symbol: cash[symbol] + position.get(symbol, 0) * last_mid.get(symbol, 0.0)
+                               for symbol in sorted(listings)}
+
+    @staticmethod
+    def order_depth(book: BookSnapshot) -> OrderDepth:
+        """
+        Build a fresh OrderDepth with best levels inserted first
+
+        :param book: (BookSnapshot) Book snapshot of a symbol
+        :return: (OrderDepth) Order depth to pass to the trader
+        """
+        order_depth = OrderDepth()
+        order_depth.buy_orders = dict(book.bids)
+        order_depth.sell_orders = dict(book.asks)
+        return order_depth
+
+    def within_limit(self, symbol: Symbol, orders: List[Order], position: Position) -> bool:
+        """
+        Check whether all orders of a symbol can be filled without breaking the position limit
+
+        :param symbol: (Symbol) Symbol of the orders
+        :param orders: (List[Order]) Orders submitted for the symbol
+        :param position: (Position) Current position of the symbol
+        :return: (bool) True if the order set is accepted
+        """
+        limit = self.limits.get(symbol)
+        if limit is None:
+            return True
+        total_long = sum(order.quantity for order in orders if order.quantity > 0)
+        total_short = sum(order.quantity for order in orders if order.quantity < 0)
+        return position + total_long <= limit and position + total_short >= -limit
+
+    @staticmethod
+    def match_orders(timestamp: int, orders: List[Order], book: BookSnapshot, position: Dict[Product, Position],
+                     cash: Dict[Symbol, float], resting: List[List[int]] = None) -> List[Trade]:
+        """
+        Match orders of a symbol against the visible book levels, consuming liquidity as orders fill
+
+        :param timestamp: (int) Current timestamp
+        :param orders: (List[Order]) Accepted orders of the symbol
+        :param book: (BookSnapshot) Book snapshot of the symbol
+        :param position: (Dict[Product, Position]) Positions to update
+        :param cash: (Dict[Symbol, float]) Cash balance per symbol to update
+        :param resting: (List[List[int]]) If given, [price, signed remaining quantity] of unfilled orders is appended
+        :return: (List[Trade]) Own trades executed
+        """
+        trades = []
+        bids = None  # remaining liquidity, copied lazily only when an order crosses
+        asks = None
+        for order in orders:
+            symbol = order.symbol
+            quantity = order.quantity
+            if quantity > 0:
+                if asks is None:
+                    asks = [[p, -v] for p, v in book.asks]
+                for level in asks:
+                    if level[0] > order.price or quantity == 0:
+                        break
+                    volume = min(quantity, level[1])
+                    if volume <= 0:
+                        continue
+                    level[1] -= volume
+                    quantity -= volume
+                    position[symbol] = position.get(symbol, 0) + volume
+                    cash[symbol] -= level[0] * volume
+                    trades.append(Trade(symbol, level[0], volume, SUBMISSION, "", timestamp))
+                if resting is not None and quantity > 0:
+                    resting.append([order.price, quantity])
+            elif quantity < 0:
+                if bids is None:
+                    bids = [[p, v] for p, v in book.bids]
+                quantity = -quantity
+                for level in bids:
+                    if level[0] < order.price or quantity == 0:
+                        break
+                    volume = min(quantity, level[1])
+                    if volume <= 0:
+                        continue
+                    level[1] -= volume
+                    quantity -= volume
+                    position[symbol] = position.get(symbol, 0) - volume
+                    cash[symbol] += level[0] * volume
+                    trades.append(Trade(symbol, level[0], volume, "", SUBMISSION, timestamp))
+                if resting is not None and quantity > 0:
+                    resting.append([order.price, -quantity])
+        return trades
+
+    @staticmethod
+    def convert(conversions: int, observations: Dict[Product, ConversionObservation],
+                position: Dict[Product, Position], cash: Dict[Symbol, float]):
+        """
+        Convert position at the OTC venue paying transport fees and tariffs.\n
+        Conversion is only allowed to reduce an existing position.
+
+        :param conversions: (int) Requested conversions, positive to buy and negative to sell
+        :param observations: (Dict[Product, ConversionObservation]) Conversion observations of the timestamp
+        :param position: (Dict[Product, Position]) Positions to update
+        :param cash: (Dict[Symbol, float]) Cash balance per symbol to update
+        """
+        for product, observation in observations.items():
+            current = position.get(product, 0)
+            if current == 0 or current * conversions > 0 or abs(conversions) > abs(current):
+                continue
+            if conversions > 0:
+                price = observation.askPrice + observation.transportFees + observation.importTariff
+            else:
+                price = observation.bidPrice - observation.transportFees - observation.exportTariff
+            position[product] = current + conversions
+            cash[product] = cash.get(product, 0.0) - price * conversions
+            break  # only a single product is convertible
+
+    @staticmethod
+    def mark_to_market(position: Dict[Product, Position], cash: Dict[Symbol, float],
+                       mid: Dict[Symbol, float]) -> float:
+        """
+        Calculate total PnL marking open positions at mid-price
+
+        :return: (float) Total PnL across symbols
+        """
+        return sum(cash.values()) + sum(q * mid.get(s, 0.0) for s, q in position.items() if q)
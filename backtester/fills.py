@@ -0,0 +1,78 @@
+from typing import List, Dict
+
+from datamodel import Symbol, Product, Position
+from backtester.data import BookSnapshot
+from backtester.engine import SUBMISSION
+from backtester.models import Trade
+
+
+class QueueFillModel:
+    """
+    Passive fill model matching resting quotes against the market trades tape of the timestamp.\n
+    Quantity of an order left after crossing the visible book rests at its price for the rest of the timestamp.
+    A tape trade fills a resting bid priced at or above the trade price, and a resting ask priced at or below it,
+    with price-time priority: quotes improving on the trade price are filled first, while a quote at the trade
+    price joins the back of the visible queue at its price, which tape trades at that price consume before it.
+    The aggressor of a trade is inferred from its price against the mid of the best levels: a trade above the mid
+    only fills asks, a trade below only fills bids, and a trade at the mid or against a one-sided book fills
+    either side from the same quantity, so a single trade never fills more than its size.
+    Fills are at the quote price with the tape counterparty, and the tape shown to the trader is left as recorded.
+    """
+    def __init__(self, queue_fraction: float = 1.0):
+        self.queue_fraction = queue_fraction  # share of visible volume at the quote price assumed ahead of it
+
+    def __repr__(self) -> str:
+        return f"QueueFillModel(queue_fraction={self.queue_fraction})"
+
+    def fill(self, timestamp: int, symbol: Symbol, resting: List[List[int]], book: BookSnapshot, tape: List[Trade],
+             position: Dict[Product, Position], cash: Dict[Symbol, float]) -> List[Trade]:
+        """
+        Fill resting quotes of a symbol from its market trades of the timestamp
+
+        :param timestamp: (int) Current timestamp
+        :param symbol: (Symbol) Symbol of the quotes
+        :param resting: (List[List[int]]) [price, signed remaining quantity] of each resting quote
+        :param book: (BookSnapshot) Book snapshot of the symbol, giving the queue at each price
+        :param tape: (List[Trade]) Market trades of the symbol at the timestamp in tape order
+        :param position: (Dict[Product, Position]) Positions to update
+        :param cash: (Dict[Symbol, float]) Cash balance per symbol to update
+        :return: (List[Trade]) Own trades filled passively
+        """
+        if not tape:
+            return []
+        bid_volumes, ask_volumes = dict(book.bids), dict(book.asks)
+        # [price, remaining, queue ahead] with best price first, so price priority is the order of the list
+        bids = sorted(([price, quantity, round(bid_volumes.get(price, 0) * self.queue_fraction)]
+                       for price, quantity in resting if quantity > 0), key=lambda quote: -quote[0])
+        asks = sorted(([price, -quantity, round(-ask_volumes.get(price, 0) * self.queue_fraction)]
+                       for price, quantity in resting if quantity < 0), key=lambda quote: quote[0])
+        # aggressor side is only inferred against a two-sided book
+        mid = (book.bids[0][0] + book.asks[0][0]) / 2 if book.bids and book.asks else None
+        trades = []
+        for trade in tape:
+            if mid is not None and trade.price > mid:  # bought by an aggressor lifting asks
+                sides = ((asks, -1),)
+            elif mid is not None and trade.price < mid:  # sold by an aggressor hitting bids
+                sides = ((bids, 1),)
+            else:
+                sides = ((bids, 1), (asks, -1))
+            quantity = trade.quantity  # left of the trade across both sides
+            for quotes, sign in sides:
+                for quote in quotes:
+                    price = quote[0]
+                    if quantity == 0 or (price - trade.price) * sign < 0:
+                        break  # quotes behind the trade price are not reached by the trade
+                    if price == trade.price:  # visible volume at the same price was queued first
+                        ahead = min(quantity, quote[2])
+                        quote[2] -= ahead
+                        quantity -= ahead
+                    volume = min(quantity, quote[1])
+                    if volume <= 0:
+                        continue
+                    quote[1] -= volume
+                    quantity -= volume
+                    position[symbol] = position.get(symbol, 0) + sign * volume
+                    cash[symbol] -= sign * price * volume
+                    buyer, seller = (SUBMISSION, trade.seller) if sign > 0 else (trade.buyer, SUBMISSION)
+                    trades.append(Trade(symbol, price, volume, buyer, seller, timestamp))
+        return trades
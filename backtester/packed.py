@@ -0,0 +1,265 @@
+from multiprocessing import shared_memory
+from typing import List, Dict, Tuple, Any
+
+import numpy as np
+
+from datamodel import Symbol, Product, UserId
+from backtester.data import BookSnapshot, DayData
+from backtester.models import Trade, ConversionObservation
+
+DEPTH = 3  # price levels per side in prices csv
+OBSERVATION_FIELDS = ('bidPrice', 'askPrice', 'transportFees', 'exportTariff', 'importTariff', 'sunlight', 'humidity')
+
+
+def pack_day(day_data: DayData) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Pack market data of a day into NumPy columns indexed by tick and symbol.\n
+    Book levels are (ticks, symbols, DEPTH) arrays with zero volume for missing levels, trades are flat arrays
+    sorted by timestamp with the range of each tick, and names are stored as indexes into lists of the meta.
+
+    :param day_data: (DayData) Market data of the day
+    :return: (Tuple[Dict[str, Any], Dict[str, np.ndarray]]) Meta of the day and its columns
+    """
+    timestamps = day_data.timestamps
+    symbols = day_data.symbols
+    products = sorted({p for tick in day_data.observations.values() for p in tick})
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+    product_index = {product: i for i, product in enumerate(products)}
+    shape = (len(timestamps), len(symbols))
+
+    present = np.zeros(shape, dtype=bool)
+    mid_price = np.zeros(shape, dtype=np.float64)
+    levels = {name: np.zeros(shape + (DEPTH,), dtype=np.int64)
+              for name in ('bid_prices', 'bid_volumes', 'ask_prices', 'ask_volumes')}
+    observations = np.zeros((len(timestamps), len(products), len(OBSERVATION_FIELDS)), dtype=np.float64)
+    observed = np.zeros((len(timestamps), len(products)), dtype=bool)
+
+    names: Dict[UserId, int] = {}
+    trades: List[Tuple[int, int, int, int, int, int]] = []
+    for t, timestamp in enumerate(timestamps):
+        for symbol, book in day_data.books[timestamp].items():
+            s = symbol_index[symbol]
+            present[t, s] = True
+            mid_price[t, s] = book.mid_price
+            for side, side_levels in (('bid', book.bids), ('ask', book.asks)):
+                for i, (price, volume) in enumerate(side_levels[:DEPTH]):
+                    levels[side + '_prices'][t, s, i] = price
+                    levels[side + '_volumes'][t, s, i] = volume
+        for product, observation in day_data.observations.get(timestamp, {}).items():
+            observed[t, product_index[product]] = True
+            observations[t, product_index[product]] = [getattr(observation, f) for f in OBSERVATION_FIELDS]
+        for symbol, symbol_trades in day_data.trades.get(timestamp, {}).items():
+            for trade in symbol_trades:
+                trades.append((t, symbol_index.setdefault(symbol, len(symbol_index)), trade.price, trade.quantity,
+                               names.setdefault(trade.buyer or '', len(names)),
+                               names.setdefault(trade.seller or '', len(names))))
+
+    trade_columns = np.array(trades, dtype=np.int64).reshape(len(trades), 6)
+    columns = {'timestamps': np.array(timestamps, dtype=np.int64),
+               'present': present,
+               'mid_price': mid_price,
+               **levels,
+               'observations': observations,
+               'observed': observed,
+               # trades are appended tick by tick, so the tick column is sorted
+               'trade_start': np.searchsorted(trade_columns[:, 0], np.arange(len(timestamps)), 'left'),
+               'trade_end': np.searchsorted(trade_columns[:, 0], np.arange(len(timestamps)), 'right'),
+               'trade_symbol': trade_columns[:, 1].copy(),
+               'trade_price': trade_columns[:, 2].copy(),
+               'trade_quantity': trade_columns[:, 3].copy(),
+               'trade_buyer': trade_columns[:, 4].copy(),
+               'trade_seller': trade_columns[:, 5].copy()}
+    # trades of symbols without a book are kept by extending the symbol list after book symbols
+    meta = {'day': day_data.day,
+            'symbols': list(symbol_index),
+            'book_symbols': len(symbols),
+            'products': products,
+            'names': list(names)}
+    return meta, columns
+
+
+class PackedDay:
+    """
+    Market data of a day backed by NumPy columns, with the same interface as DayData.\n
+    Columns are only views, e.g. of shared memory or memory-mapped files, and book snapshots, trades and
+    observations of a timestamp are built from them on access.
+    """
+    def __init__(self, meta: Dict[str, Any], columns: Dict[str, np.ndarray], source: Any = None):
+        self.source = source  # owner of the column memory, e.g. shared memory block, kept alive with the day
+        self.day: int = meta['day']
+        self.symbols: List[Symbol] = meta['symbols'][:meta['book_symbols']]
+        self.trade_symbols: List[Symbol] = meta['symbols']
+        self.products: List[Product] = meta['products']
+        self.names: List[UserId] = meta['names']
+        self.columns = columns
+        self.timestamps: List[int] = columns['timestamps'].tolist()
+        self.index = {timestamp: t for t, timestamp in enumerate(self.timestamps)}  # row of each timestamp
+        self.books = TickView(self, self.book_snapshots)
+        self.trades = TickView(self, self.market_trades)
+        self.observations = TickView(self, self.conversion_observations)
+
+    def __repr__(self) -> str:
+        return f"PackedDay(day={self.day}, ticks={len(self.timestamps)}, symbols={self.symbols})"
+
+    def rows(self, start: int = None, end: int = None) -> slice:
+        """
+        Rows of timestamps in [start, end) found by binary search on the sorted timestamps column
+
+        :param start: (int) First timestamp, default first of the day
+        :param end: (int) Timestamp after the last, default end of the day
+        :return: (slice) Rows to index columns with
+        """
+        timestamps = self.columns['timestamps']
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, 'left'))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, 'left'))
+        return slice(first, last)
+
+    def select(self, column: str, symbol: Symbol = None, start: int = None, end: int = None) -> np.ndarray:
+        """
+        View of a per-tick column for a symbol and time range, reading only the selected rows of mapped files.\n
+        e.g. day.select('mid_price', 'STARFRUIT', 100000, 200000) or day.select('bid_prices', 'ROSES')[:, 0]
+
+        :param column: (str) Name of a per-tick column
+        :param symbol: (Symbol) Symbol of book columns, default all symbols
+        :param start: (int) First timestamp, default first of the day
+        :param end: (int) Timestamp after the last, default end of the day
+        :return: (np.ndarray) View of the column
+        """
+        view = self.columns[column][self.rows(start, end)]
+        return view if symbol is None else view[:, self.symbols.index(symbol)]
+
+    def book_snapshots(self, t: int) -> Dict[Symbol, BookSnapshot]:
+        """
+        :param t: (int) Row of the timestamp
+        :return: (Dict[Symbol, BookSnapshot]) Book snapshot of each symbol present at the timestamp
+        """
+        c = self.columns
+        present = c['present'][t].tolist()
+        mid_price = c['mid_price'][t].tolist()
+        bid_prices, bid_volumes = c['bid_prices'][t].tolist(), c['bid_volumes'][t].tolist()
+        ask_prices, ask_volumes = c['ask_prices'][t].tolist(), c['ask_volumes'][t].tolist()
+        books = {}
+        for s, symbol in enumerate(self.symbols):
+            if present[s]:
+                bids = tuple((p, v) for p, v in zip(bid_prices[s], bid_volumes[s]) if v)
+                asks = tuple((p, v) for p, v in zip(ask_prices[s], ask_volumes[s]) if v)
+                books[symbol] = BookSnapshot(bids, asks, mid_price[s])
+        return books
+
+    def market_trades(self, t: int) -> Dict[Symbol, List[Trade]]:
+        """
+        :param t: (int) Row of the timestamp
+        :return: (Dict[Symbol, List[Trade]]) Market trades of the timestamp by symbol
+        """
+        c = self.columns
+        start, end = int(c['trade_start'][t]), int(c['trade_end'][t])
+        trades: Dict[Symbol, List[Trade]] = {}
+        if start == end:
+            return trades
+        timestamp = self.timestamps[t]
+        for s, price, quantity, buyer, seller in zip(c['trade_symbol'][start:end].tolist(),
+                                                     c['trade_price'][start:end].tolist(),
+                                                     c['trade_quantity'][start:end].tolist(),
+                                                     c['trade_buyer'][start:end].tolist(),
+                                                     c['trade_seller'][start:end].tolist()):
+            symbol = self.trade_symbols[s]
+            trades.setdefault(symbol, []).append(Trade(symbol, price, quantity, self.names[buyer], self.names[seller],
+                                                       timestamp))
+        return trades
+
+    def conversion_observations(self, t: int) -> Dict[Product, ConversionObservation]:
+        """
+        :param t: (int) Row of the timestamp
+        :return: (Dict[Product, ConversionObservation]) Conversion observation of each observed product
+        """
+        c = self.columns
+        observed = c['observed'][t].tolist()
+        values = c['observations'][t].tolist()
+        return {product: ConversionObservation(*values[p]) for p, product in enumerate(self.products) if observed[p]}
+
+
+class TickView:
+    """
+    Read-only mapping of timestamp to objects built from a row of PackedDay columns
+    """
+    def __init__(self, day: PackedDay, build):
+        self.day = day
+        self.build = build  # builds objects of a row
+
+    def __getitem__(self, timestamp: int):
+        return self.build(self.day.index[timestamp])
+
+    def __contains__(self, timestamp: int) -> bool:
+        return timestamp in self.day.index
+
+    def get(self, timestamp: int, default=None):
+        t = self.day.index.get(timestamp)
+        return default if t is None else self.build(t)
+
+
+class SharedDays:
+    """
+    Packed market data of days in a single shared memory block.\n
+    The owner process packs the days once, and worker processes attach with the picklable spec
+    to read PackedDay views of the same memory without copying.
+    """
+    def __init__(self, days: List[DayData]):
+        packed = [pack_day(day_data) for day_data in days]
+        size = sum(column.nbytes for _, columns in packed for column in columns.values())
+        self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.spec: Tuple[str, List[Tuple[Dict[str, Any], Dict[str, Tuple[str, tuple, int]]]]] = (self.memory.name, [])
+        offset = 0
+        for meta, columns in packed:
+            layout = {}
+            for name, column in columns.items():
+                view = np.ndarray(column.shape, dtype=column.dtype, buffer=self.memory.buf, offset=offset)
+                view[...] = column
+                layout[name] = (column.dtype.str, column.shape, offset)
+                offset += column.nbytes
+            self.spec[1].append((meta, layout))
+        self.days = self.views(self.memory, self.spec[1])
+
+    @staticmethod
+    def views(memory: shared_memory.SharedMemory,
+              layouts: List[Tuple[Dict[str, Any], Dict[str, Tuple[str, tuple, int]]]]) -> List[PackedDay]:
+        """
+        Build PackedDay of each day over the shared memory block
+
+        :return: (List[PackedDay]) Days sharing the memory block
+        """
+        days = []
+        for meta, layout in layouts:
+            columns = {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf, offset=offset)
+                       for name, (dtype, shape, offset) in layout.items()}
+            for column in columns.values():
+                column.flags.writeable = False
+            days.append(PackedDay(meta, columns, memory))
+        return days
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, list]) -> List[PackedDay]:
+        """
+        Attach to the shared memory of an owner from a process started by the owner, e.g. a pool worker,
+        which shares the resource tracker of the owner so the block is unlinked only once
+
+        :param spec: (Tuple[str, list]) Spec of the owner
+        :return: (List[PackedDay]) Days backed by the shared memory
+        """
+        return cls.views(shared_memory.SharedMemory(name=spec[0]), spec[1])
+
+    def close(self):
+        """
+        Unlink the shared memory block and release it once no view of the days is left
+        """
+        self.days = []
+        self.memory.unlink()
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # views still held elsewhere keep the mapping alive until they are released
+
+    def __enter__(self) -> 'SharedDays':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
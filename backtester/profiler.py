@@ -0,0 +1,209 @@
+import functools
+import inspect
+import time
+from typing import List, Dict, Tuple, Callable, Any
+
+# functions of libraries called by round files, wrapped in place while a profiler is attached
+LIBRARY_FUNCTIONS = [('jsonpickle', 'encode'), ('jsonpickle', 'decode')]
+SUB_BITS = 3  # each power of two of durations is split into 2^SUB_BITS histogram buckets
+
+
+class SpanProfiler:
+    """
+    Opt-in instrumentation timing constructors and methods of the classes of a trader module with perf_counter_ns.\n
+    Methods are wrapped only when a module is instrumented, so traders run unmodified code when profiling is off.
+    Spans are aggregated per method into call counts, total and self time and a log-linear histogram of durations
+    splitting each power of two into 2^SUB_BITS buckets, and per call stack into self time written as folded stacks
+    for flamegraph tools.
+    """
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.total: Dict[str, int] = {}  # ns including nested spans
+        self.own: Dict[str, int] = {}  # ns excluding nested spans
+        self.longest: Dict[str, int] = {}
+        self.histograms: Dict[str, Dict[int, int]] = {}  # bucket of bucket_bounds to number of spans
+        self.stacks: Dict[str, int] = {}  # ';' joined span names to self ns
+        self.frames: List[List[Any]] = []  # [name, nested ns] of open spans
+        self.patched: List[Tuple[Any, str, Any]] = []  # (owner, attribute, original) of library functions
+
+    def span(self, name: str, func: Callable) -> Callable:
+        """
+        Wrap a function with a span named after it
+
+        :param name: (str) Name of the span, e.g. BasketTrading.__init__
+        :param func: (Callable) Function to wrap
+        :return: (Callable) Wrapped function
+        """
+        frames = self.frames
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            frame = [name, 0]
+            frames.append(frame)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                frames.pop()
+                if frames:
+                    frames[-1][1] += elapsed
+                self.record(name, elapsed, elapsed - frame[1])
+        wrapper.__profiled__ = True
+        return wrapper
+
+    def record(self, name: str, elapsed: int, own: int):
+        """
+        Aggregate a closed span, called while the frames of its callers are still open
+
+        :param name: (str) Name of the span
+        :param elapsed: (int) Duration of the span in ns
+        :param own: (int) Duration excluding nested spans in ns
+        """
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.total[name] = self.total.get(name, 0) + elapsed
+        self.own[name] = self.own.get(name, 0) + own
+        if elapsed > self.longest.get(name, -1):
+            self.longest[name] = elapsed
+        histogram = self.histograms.setdefault(name, {})
+        bucket = self.bucket(elapsed)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+        stack = ';'.join([frame[0] for frame in self.frames] + [name])
+        self.stacks[stack] = self.stacks.get(stack, 0) + own
+
+    def instrument(self, module: Any):
+        """
+        Wrap __init__ and every method defined by the classes of a module, and rewire strategy blocks
+        registered on class attributes (e.g. StrategyRegistry.blocks) to the wrapped methods.\n
+        Called again after every reload of the module since reloading creates new classes.
+
+        :param module: (module) Trader module, e.g. round_5
+        """
+        wrapped: Dict[Any, Callable] = {}  # original function to its wrapper
+        classes = [c for c in vars(module).values() if inspect.isclass(c) and c.__module__ == module.__name__]
+        for cls in classes:
+            for attribute, value in list(vars(cls).items()):
+                if attribute.startswith('__') and attribute != '__init__':
+                    continue
+                if isinstance(value, (staticmethod, classmethod)):
+                    func = value.__func__
+                    if not getattr(func, '__profiled__', False):
+                        wrapped[func] = self.span(f"{cls.__name__}.{attribute}", func)
+                        setattr(cls, attribute, type(value)(wrapped[func]))
+                elif inspect.isfunction(value) and not getattr(value, '__profiled__', False):
+                    wrapped[value] = self.span(f"{cls.__name__}.{attribute}", value)
+                    setattr(cls, attribute, wrapped[value])
+
+        for cls in classes:
+            for value in vars(cls).values():
+                blocks = getattr(value, 'blocks', None)
+                if isinstance(blocks, dict):
+                    for name, (block, *inputs) in blocks.items():
+                        if block in wrapped:
+                            blocks[name] = (wrapped[block], *inputs)
+
+        for library, function in LIBRARY_FUNCTIONS:
+            owner = vars(module).get(library)
+            original = getattr(owner, function, None)
+            if original is not None and not getattr(original, '__profiled__', False):
+                self.patched.append((owner, function, original))
+                setattr(owner, function, self.span(f"{library}.{function}", original))
+
+    def close(self):
+        """
+        Restore library functions patched by instrument, classes of the module are left wrapped until reloaded
+        """
+        for owner, function, original in reversed(self.patched):
+            setattr(owner, function, original)
+        self.patched = []
+
+    def __enter__(self) -> 'SpanProfiler':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def bucket(elapsed: int) -> int:
+        """
+        Histogram bucket of a duration, the power of two of the duration in the high bits and
+        the SUB_BITS bits following its leading bit in the low bits
+
+        :param elapsed: (int) Duration in ns
+        :return: (int) Bucket
+        """
+        octave = elapsed.bit_length()
+        if octave <= SUB_BITS:
+            return octave << SUB_BITS  # durations below 2^SUB_BITS ns are not split further
+        return (octave << SUB_BITS) | ((elapsed >> (octave - 1 - SUB_BITS)) & ((1 << SUB_BITS) - 1))
+
+    @staticmethod
+    def bucket_bounds(bucket: int) -> Tuple[int, int]:
+        """
+        :return: (Tuple[int, int]) Durations [low, high) in ns counted by a bucket
+        """
+        octave, sub = bucket >> SUB_BITS, bucket & ((1 << SUB_BITS) - 1)
+        if octave <= SUB_BITS:
+            return (1 << octave) >> 1, 1 << octave
+        width = 1 << (octave - 1 - SUB_BITS)
+        low = (1 << (octave - 1)) + sub * width
+        return low, low + width
+
+    def percentile(self, name: str, q: float) -> int:
+        """
+        Estimate a percentile of span durations from the histogram, interpolating linearly within the bucket
+        of the percentile, so the estimate is within a bucket width (1 / 2^SUB_BITS of its power of two)
+
+        :param name: (str) Name of the span
+        :param q: (float) Quantile in [0, 1]
+        :return: (int) Estimated percentile in ns, at most the longest span
+        """
+        histogram = self.histograms[name]
+        target = q * self.calls[name]
+        count = 0
+        for bucket in sorted(histogram):
+            if count + histogram[bucket] >= target:
+                low, high = self.bucket_bounds(bucket)
+                estimate = low + (target - count) / histogram[bucket] * (high - low)
+                return min(round(estimate), self.longest[name])
+            count += histogram[bucket]
+        return self.longest[name]
+
+    def report(self, top: int = 30) -> str:
+        """
+        Build a text table of spans sorted by self time, with the histogram of the slowest spans
+
+        :param top: (int) Number of spans to list
+        :return: (str) Printable report
+        """
+        names = sorted(self.own, key=self.own.get, reverse=True)[:top]
+        lines = [f"{'span':<48}{'calls':>9}{'total ms':>11}{'self ms':>10}{'mean us':>10}{'p50 us':>9}"
+                 f"{'p99 us':>9}{'max us':>10}"]
+        for name in names:
+            lines.append(f"{name:<48}{self.calls[name]:>9}{self.total[name] / 1e6:>11.1f}{self.own[name] / 1e6:>10.1f}"
+                         f"{self.total[name] / self.calls[name] / 1e3:>10.1f}"
+                         f"{self.percentile(name, 0.5) / 1e3:>9.1f}{self.percentile(name, 0.99) / 1e3:>9.1f}"
+                         f"{self.longest[name] / 1e3:>10.1f}")
+        for name in names[:5]:
+            histogram = {}  # buckets merged per power of two, which bucket b >> SUB_BITS counts below 2^b ns
+            for bucket, count in self.histograms[name].items():
+                histogram[bucket >> SUB_BITS] = histogram.get(bucket >> SUB_BITS, 0) + count
+            peak = max(histogram.values())
+            lines.append(f"\n{name} durations")
+            for octave in range(min(histogram), max(histogram) + 1):
+                count = histogram.get(octave, 0)
+                lines.append(f"  < {(1 << octave) / 1e3:>10.1f} us {count:>9} {'#' * round(40 * count / peak)}")
+        return '\n'.join(lines)
+
+    def dump_folded(self, path: str):
+        """
+        Write self time of every call stack in microseconds as folded stacks ("a;b;c 123" per line),
+        the input format of flamegraph.pl, inferno and speedscope
+
+        :param path: (str) Output file
+        """
+        with open(path, 'w') as f:
+            for stack, own in sorted(self.stacks.items()):
+                if own >= 1000:
+                    f.write(f"{stack} {own // 1000}\n")
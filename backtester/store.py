@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import re
+import sys
+from typing import List, Optional
+
+import numpy as np
+
+from backtester.data import DayData, discover_days, load_days
+from backtester.packed import PackedDay, pack_day
+
+DAY_DIR = re.compile(r"day_(-?\d+)$")
+META_FILE = 'meta.json'
+
+
+def day_dir(store_dir: str, day: int) -> str:
+    """
+    :return: (str) Directory of the columns of a day
+    """
+    return os.path.join(store_dir, f"day_{day}")
+
+
+def write_day(store_dir: str, day_data: DayData):
+    """
+    Write a day into the tick store as one .npy file per column and the meta of the day
+
+    :param store_dir: (str) Root directory of the tick store
+    :param day_data: (DayData) Market data of the day
+    """
+    meta, columns = pack_day(day_data)
+    path = day_dir(store_dir, day_data.day)
+    os.makedirs(path, exist_ok=True)
+    for name, column in columns.items():
+        np.save(os.path.join(path, name + '.npy'), column)
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+
+def store_days(store_dir: str) -> List[int]:
+    """
+    :param store_dir: (str) Root directory of the tick store
+    :return: (List[int]) Days in the tick store, sorted
+    """
+    days = []
+    for name in os.listdir(store_dir):
+        match = DAY_DIR.match(name)
+        if match and os.path.isfile(os.path.join(store_dir, name, META_FILE)):
+            days.append(int(match.group(1)))
+    return sorted(days)
+
+
+def is_store(path: str) -> bool:
+    """
+    :param path: (str) Directory of market data
+    :return: (bool) True if the directory is a tick store rather than csv files
+    """
+    return os.path.isdir(path) and bool(store_days(path))
+
+
+def load_store(store_dir: str, days: Optional[List[int]] = None) -> List[PackedDay]:
+    """
+    Memory-map days of the tick store, columns are read from disk only when rows are accessed
+
+    :param store_dir: (str) Root directory of the tick store
+    :param days: (List[int]) Days to load, default all days in the store
+    :return: (List[PackedDay]) Days backed by memory-mapped columns
+    """
+    available = store_days(store_dir)
+    result = []
+    for day in available if days is None else days:
+        if day not in available:
+            raise FileNotFoundError(f"No day {day} in tick store {store_dir}")
+        path = day_dir(store_dir, day)
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        # plain ndarray views of the maps avoid memmap overhead on every per-tick slice
+        columns = {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r').view(np.ndarray)
+                   for name in os.listdir(path) if name.endswith('.npy')}
+        result.append(PackedDay(meta, columns))
+    return result
+
+
+def main(argv=None):
+    sys.path.insert(0, os.getcwd())
+    parser = argparse.ArgumentParser(prog='python -m backtester.store',
+                                     description='Convert Prosperity csv files into a columnar tick store')
+    parser.add_argument('data_dir', help='directory with prices, trades and observations csv files')
+    parser.add_argument('store_dir', help='root directory of the tick store to write')
+    parser.add_argument('--days', type=int, nargs='+', help='days to convert, default all')
+    args = parser.parse_args(argv)
+
+    days = args.days or sorted(d for d, kinds in discover_days(args.data_dir).items() if 'prices' in kinds)
+    for day in days:  # parse one day at a time to bound memory
+        day_data = load_days(args.data_dir, [day])[0]
+        write_day(args.store_dir, day_data)
+        print(f"day {day_data.day}: {len(day_data.timestamps)} ticks, {len(day_data.symbols)} symbols")
+
+
+if __name__ == '__main__':
+    main()
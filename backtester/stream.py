@@ -0,0 +1,139 @@
+import heapq
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional, Union
+
+from datamodel import Symbol, Product
+from backtester.data import BookSnapshot, DayData, discover_days, iter_prices, iter_trades, iter_observations
+from backtester.models import Trade, ConversionObservation
+from backtester.packed import PackedDay
+
+
+class Tick:
+    """
+    Market data of a single timestamp, built on demand by a tick stream and dropped once replayed
+    """
+    __slots__ = ('timestamp', 'books', 'trades', 'observations')
+
+    def __init__(self, timestamp: int, books: Dict[Symbol, BookSnapshot], trades: Dict[Symbol, List[Trade]],
+                 observations: Dict[Product, ConversionObservation]):
+        self.timestamp = timestamp
+        self.books = books  # book snapshot of each symbol quoted at the timestamp
+        self.trades = trades  # market trades of the timestamp by symbol
+        self.observations = observations  # conversion observation of each observed product
+
+
+def day_ticks(day_data: Union[DayData, PackedDay]) -> Iterator[Tick]:
+    """
+    Ticks of a loaded day in timestamp order, rows of a PackedDay are only built when the tick is reached
+
+    :param day_data: (DayData | PackedDay) Market data of the day
+    :return: (Iterator[Tick]) Ticks of the day
+    """
+    books, trades, observations = day_data.books, day_data.trades, day_data.observations
+    for timestamp in day_data.timestamps:
+        yield Tick(timestamp, books[timestamp], trades.get(timestamp, {}), observations.get(timestamp, {}))
+
+
+def stream_ticks(files: Dict[str, List[str]], product: Product = 'ORCHIDS') -> Iterator[Tick]:
+    """
+    Ticks of a day parsed lazily from its csv files, holding only the rows of the current timestamp.\n
+    Files of each kind must be sorted by timestamp, as the official data is, and are merged across rounds
+    with the same precedence as load_days: the first prices file quoting a symbol wins, trades are kept
+    in file order and the last observation of a timestamp wins.
+    Market trades and observations of timestamps without any book are dropped as they are never replayed.
+
+    :param files: (Dict[str, List[str]]) File kind ('prices', 'trades', 'observations') to paths of the day
+    :param product: (Product) Product which can be converted with the observations
+    :return: (Iterator[Tick]) Ticks of the day
+    """
+    # heapq.merge is stable, rows of equal timestamps keep the order of the files
+    prices = heapq.merge(*(iter_prices(path) for path in files.get('prices', [])), key=lambda row: row[0])
+    trades = heapq.merge(*(iter_trades(path) for path in files.get('trades', [])), key=lambda row: row[0])
+    observations = heapq.merge(*(iter_observations(path) for path in files.get('observations', [])),
+                               key=lambda row: row[0])
+    pending_trade = next(trades, None)
+    pending_observation = next(observations, None)
+
+    timestamp: Optional[int] = None
+    books: Dict[Symbol, BookSnapshot] = {}
+    for row_timestamp, symbol, book in prices:
+        if row_timestamp != timestamp:
+            if timestamp is not None:
+                tick_trades, pending_trade = collect_trades(timestamp, pending_trade, trades)
+                tick_observations, pending_observation = collect_observations(timestamp, pending_observation,
+                                                                              observations, product)
+                yield Tick(timestamp, books, tick_trades, tick_observations)
+            timestamp, books = row_timestamp, {}
+        if symbol not in books:
+            books[symbol] = book
+    if timestamp is not None:
+        tick_trades, _ = collect_trades(timestamp, pending_trade, trades)
+        tick_observations, _ = collect_observations(timestamp, pending_observation, observations, product)
+        yield Tick(timestamp, books, tick_trades, tick_observations)
+
+
+def collect_trades(timestamp: int, pending: Optional[Tuple[int, Trade]],
+                   rows: Iterator[Tuple[int, Trade]]) -> Tuple[Dict[Symbol, List[Trade]], Optional[Tuple[int, Trade]]]:
+    """
+    Consume trade rows up to a timestamp, skipping rows of earlier timestamps
+
+    :param timestamp: (int) Timestamp of the tick
+    :param pending: (Tuple[int, Trade]) First row not consumed yet, None once rows are exhausted
+    :param rows: (Iterator[Tuple[int, Trade]]) Remaining trade rows
+    :return: (Tuple[Dict[Symbol, List[Trade]], Optional[Tuple[int, Trade]]]) Trades of the tick and next pending row
+    """
+    trades: Dict[Symbol, List[Trade]] = {}
+    while pending is not None and pending[0] <= timestamp:
+        if pending[0] == timestamp:
+            trade = pending[1]
+            trades.setdefault(trade.symbol, []).append(trade)
+        pending = next(rows, None)
+    return trades, pending
+
+
+def collect_observations(timestamp: int, pending: Optional[Tuple[int, ConversionObservation]],
+                         rows: Iterator[Tuple[int, ConversionObservation]], product: Product
+                         ) -> Tuple[Dict[Product, ConversionObservation], Optional[Tuple[int, ConversionObservation]]]:
+    """
+    Consume observation rows up to a timestamp, skipping rows of earlier timestamps
+
+    :param timestamp: (int) Timestamp of the tick
+    :param pending: (Tuple[int, ConversionObservation]) First row not consumed yet, None once rows are exhausted
+    :param rows: (Iterator[Tuple[int, ConversionObservation]]) Remaining observation rows
+    :param product: (Product) Product which can be converted with the observations
+    :return: (Tuple[Dict[Product, ConversionObservation], Optional[Tuple[int, ConversionObservation]]])
+        Observations of the tick and next pending row
+    """
+    observations: Dict[Product, ConversionObservation] = {}
+    while pending is not None and pending[0] <= timestamp:
+        if pending[0] == timestamp:
+            observations[product] = pending[1]
+        pending = next(rows, None)
+    return observations, pending
+
+
+def stream_days(data_dir: str, days: Optional[List[int]] = None) -> Iterator[Tuple[int, Iterator[Tick]]]:
+    """
+    Days of a csv directory as lazy tick streams, a day is only opened once the previous one is replayed
+
+    :param data_dir: (str) Directory containing Prosperity csv files
+    :param days: (List[int]) Days to stream, default all days found
+    :return: (Iterator[Tuple[int, Iterator[Tick]]]) Day and its ticks
+    """
+    files = discover_days(data_dir)
+    if days is None:
+        days = sorted(d for d, kinds in files.items() if 'prices' in kinds)
+    for day in days:
+        if day not in files or 'prices' not in files[day]:
+            raise FileNotFoundError(f"No prices csv for day {day} in {data_dir}")
+        yield day, stream_ticks(files[day])
+
+
+def loaded_days(days: Iterable[Union[DayData, PackedDay]]) -> Iterator[Tuple[int, Iterator[Tick]]]:
+    """
+    Loaded days as tick streams, consuming the iterable of days lazily
+
+    :param days: (Iterable[DayData | PackedDay]) Market data of days
+    :return: (Iterator[Tuple[int, Iterator[Tick]]]) Day and its ticks
+    """
+    for day_data in days:
+        yield day_data.day, day_ticks(day_data)
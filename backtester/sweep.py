@@ -0,0 +1,208 @@
+import argparse
+import ast
+import csv
+import importlib
+import itertools
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Tuple, Any
+
+from backtester.data import load_days
+from backtester.engine import Backtester, trader_factory
+from backtester.fills import QueueFillModel
+from backtester.packed import PackedDay, SharedDays
+
+# parameter key is PRODUCT.KEY of Trader.config['STRATEGY'], e.g. STARFRUIT.MIN_WINDOW_SIZE
+Param = Tuple[str, str]
+
+# market data attached once per worker process by the pool initializer
+worker_days: List[PackedDay] = []
+worker_module = ''
+worker_fill_model = None
+
+
+def parse_values(spec: str) -> Any:
+    """
+    Parse values of a parameter, either comma separated values or lo:hi range for random search
+
+    :param spec: (str) Values specification, e.g. 3,5,7 or 1.0:2.0
+    :return: (List | Tuple) List of values, or (lo, hi) tuple for a range
+    """
+    if ':' in spec:
+        lo, hi = (ast.literal_eval(v) for v in spec.split(':', 1))
+        return lo, hi
+    return [ast.literal_eval(v) for v in spec.split(',')]
+
+
+def parse_param(arg: str) -> Tuple[Param, Any]:
+    """
+    Parse a PRODUCT.KEY=VALUES command line argument
+
+    :param arg: (str) Argument of --param
+    :return: (Tuple[Param, Any]) Parameter and its values
+    """
+    name, spec = arg.split('=', 1)
+    product, key = name.rsplit('.', 1)
+    return (product, key), parse_values(spec)
+
+
+def grid_search(space: Dict[Param, Any]) -> List[Dict[Param, Any]]:
+    """
+    All combinations of parameter values
+
+    :param space: (Dict[Param, Any]) Values of each parameter
+    :return: (List[Dict[Param, Any]]) Parameter sets
+    """
+    for param, values in space.items():
+        if isinstance(values, tuple):
+            raise ValueError(f"Range of {'.'.join(param)} needs random search, use --samples")
+    return [dict(zip(space, combination)) for combination in itertools.product(*space.values())]
+
+
+def random_search(space: Dict[Param, Any], samples: int, seed: int = 0) -> List[Dict[Param, Any]]:
+    """
+    Random parameter sets drawing each parameter from its values or uniformly from its range,
+    integers for integer bounds and floats rounded to 4 decimals otherwise
+
+    :param space: (Dict[Param, Any]) Values or (lo, hi) range of each parameter
+    :param samples: (int) Number of parameter sets
+    :param seed: (int) Random seed
+    :return: (List[Dict[Param, Any]]) Parameter sets
+    """
+    rng = random.Random(seed)
+
+    def draw(values):
+        if not isinstance(values, tuple):
+            return rng.choice(values)
+        lo, hi = values
+        if isinstance(lo, int) and isinstance(hi, int):
+            return rng.randint(lo, hi)
+        return round(rng.uniform(lo, hi), 4)
+    return [{param: draw(values) for param, values in space.items()} for _ in range(samples)]
+
+
+def validate(module_name: str, params: List[Param]):
+    """
+    Check that every swept key exists in Trader.config['STRATEGY'] of the module
+
+    :param module_name: (str) Trader module name
+    :param params: (List[Param]) Swept parameters
+    """
+    config = importlib.import_module(module_name).Trader.config['STRATEGY']
+    for product, key in params:
+        if key not in config.get(product, {}):
+            raise KeyError(f"{product}.{key} is not in Trader.config['STRATEGY']")
+
+
+def init_worker(module_name: str, spec: Tuple[str, list], fill_model: QueueFillModel = None):
+    """
+    Attach market data packed in shared memory by the parent, shared by all backtests of all workers
+
+    :param module_name: (str) Trader module name
+    :param spec: (Tuple[str, list]) Spec of SharedDays of the parent
+    :param fill_model: (QueueFillModel) Passive fill model of the backtests, default None
+    """
+    global worker_days, worker_module, worker_fill_model
+    sys.path.insert(0, os.getcwd())
+    worker_module = module_name
+    worker_fill_model = fill_model
+    worker_days = SharedDays.attach(spec)
+
+
+def run_params(params: Dict[Param, Any]) -> Tuple[Dict[Param, Any], float, int, float]:
+    """
+    Backtest a parameter set on the data of the worker
+
+    :param params: (Dict[Param, Any]) Parameter set to apply on Trader.config['STRATEGY']
+    :return: (Tuple[Dict[Param, Any], float, int, float]) Parameter set, total PnL, own trades and seconds
+    """
+    overrides: Dict[str, Dict[str, Any]] = {}
+    for (product, key), value in params.items():
+        overrides.setdefault(product, {})[key] = value
+    result = Backtester(trader_factory(worker_module, overrides), fill_model=worker_fill_model).run(worker_days)
+    return params, result.total_pnl, result.own_trades, result.elapsed
+
+
+def heatmap(results: List[Tuple[Dict[Param, Any], float]], row: Param, column: Param) -> str:
+    """
+    Text table of mean total PnL over two parameters
+
+    :param results: (List[Tuple[Dict[Param, Any], float]]) Parameter sets and their total PnL
+    :param row: (Param) Parameter of rows
+    :param column: (Param) Parameter of columns
+    :return: (str) Printable heatmap
+    """
+    cells: Dict[Tuple[Any, Any], List[float]] = {}
+    for params, pnl in results:
+        cells.setdefault((params[row], params[column]), []).append(pnl)
+    rows = sorted({r for r, _ in cells})
+    columns = sorted({c for _, c in cells})
+    lines = [f"{'.'.join(row) + ' / ' + '.'.join(column):<32}" + ''.join(f"{str(c):>14}" for c in columns)]
+    for r in rows:
+        values = [cells.get((r, c)) for c in columns]
+        lines.append(f"{str(r):<32}" + ''.join(f"{sum(v) / len(v):>14,.1f}" if v else f"{'':>14}" for v in values))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    sys.path.insert(0, os.getcwd())
+    parser = argparse.ArgumentParser(prog='python -m backtester.sweep',
+                                     description="Backtest parameter sets of Trader.config['STRATEGY'] in parallel")
+    parser.add_argument('trader', help='trader module or file, e.g. round_5')
+    parser.add_argument('data_dir', help='directory with prices, trades and observations csv files')
+    parser.add_argument('--days', type=int, nargs='+', help='days to replay, default all')
+    parser.add_argument('--param', action='append', required=True, type=parse_param,
+                        help='PRODUCT.KEY=v1,v2,... or PRODUCT.KEY=lo:hi for random search, repeatable')
+    parser.add_argument('--samples', type=int, help='number of random parameter sets instead of full grid')
+    parser.add_argument('--seed', type=int, default=0, help='seed of random search')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes, default all cores')
+    parser.add_argument('--queue-fills', type=float, metavar='FRACTION', nargs='?', const=1.0,
+                        help='fill resting quotes from market trades behind FRACTION of the visible queue')
+    parser.add_argument('--csv', help='append results to this csv file as they finish')
+    args = parser.parse_args(argv)
+
+    module_name = os.path.splitext(os.path.basename(args.trader))[0]
+    space = dict(args.param)
+    validate(module_name, list(space))
+    param_sets = random_search(space, args.samples, args.seed) if args.samples else grid_search(space)
+    names = ['.'.join(param) for param in space]
+    fill_model = None if args.queue_fills is None else QueueFillModel(args.queue_fills)
+
+    writer = None
+    csv_file = open(args.csv, 'a', newline='') if args.csv else None
+    if csv_file:
+        writer = csv.writer(csv_file)
+        if csv_file.tell() == 0:
+            writer.writerow(names + ['total_pnl', 'own_trades', 'seconds'])
+
+    widths = [max(len(name), 12) + 2 for name in names]
+    print(''.join(f"{name:>{width}}" for name, width in zip(names, widths))
+          + f"{'total PnL':>16}{'trades':>8}{'seconds':>9}")
+    results = []
+    # csv files are parsed once, workers read the packed data from shared memory without copying
+    with SharedDays(load_days(args.data_dir, args.days)) as shared, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                initargs=(module_name, shared.spec, fill_model)) as executor:
+        futures = [executor.submit(run_params, params) for params in param_sets]
+        for future in as_completed(futures):  # stream rows in order of completion
+            params, pnl, trades, elapsed = future.result()
+            results.append((params, pnl))
+            values = [params[param] for param in space]
+            print(''.join(f"{str(v):>{width}}" for v, width in zip(values, widths))
+                  + f"{pnl:>16,.1f}{trades:>8}{elapsed:>9.2f}", flush=True)
+            if writer:
+                writer.writerow(values + [pnl, trades, round(elapsed, 3)])
+                csv_file.flush()
+    if csv_file:
+        csv_file.close()
+
+    best_params, best_pnl = max(results, key=lambda r: r[1])
+    print(f"\nBest total PnL {best_pnl:,.1f} with " + ', '.join(f"{'.'.join(p)}={v}" for p, v in best_params.items()))
+    if len(space) == 2:
+        print('\n' + heatmap(results, *space))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import random
+import timeit
+
+from round_5 import RollingRegression, RollingMoments, JsonPickleCodec, BinaryCodec
+
+
+def build_data(starfruit_window: int, coconut_window: int) -> dict:
+    """
+    Build Trader.data with full windows of random walk values
+
+    :param starfruit_window: (int) Window size of STARFRUIT mid vwap
+    :param coconut_window: (int) Window size of COCONUT implied volatility
+    :return: (dict) Data as stored in Trader.data
+    """
+    starfruit, coconut = RollingRegression(), RollingMoments()
+    price, iv = 5000.0, 0.16
+    for _ in range(starfruit_window):
+        price += random.gauss(0, 1)
+        starfruit.append(price)
+    for _ in range(coconut_window):
+        iv += random.gauss(0, 0.001)
+        coconut.append(iv)
+    return {"STARFRUIT": starfruit, "COCONUT": coconut}
+
+
+def main(number: int = 1000):
+    random.seed(0)
+    codecs = {'jsonpickle': JsonPickleCodec(), 'binary': BinaryCodec()}
+    print(f"{'windows':<12}{'codec':<12}{'encode us':>12}{'decode us':>12}{'bytes':>10}")
+    for windows in ((10, 300), (500, 300)):
+        data = build_data(*windows)
+        for name, codec in codecs.items():
+            encoded = codec.encode(data)
+            encode_time = timeit.timeit(lambda: codec.encode(data), number=number) / number
+            decode_time = timeit.timeit(lambda: codec.decode(encoded), number=number) / number
+            label = f"{windows[0]}/{windows[1]}"
+            print(f"{label:<12}{name:<12}{encode_time * 1e6:>12.1f}{decode_time * 1e6:>12.1f}{len(encoded):>10}")
+
+
+if __name__ == '__main__':
+    main()
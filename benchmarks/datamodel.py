@@ -0,0 +1,99 @@
+import sys
+import time
+import tracemalloc
+import timeit
+
+import datamodel
+from backtester import models
+
+TICKS = 30000
+SYMBOLS = ['AMETHYSTS', 'STARFRUIT', 'ORCHIDS', 'GIFT_BASKET', 'CHOCOLATE', 'STRAWBERRIES', 'ROSES',
+           'COCONUT', 'COCONUT_COUPON']
+
+# constructor arguments of each class, identical for both variants
+ARGS = {'Listing': ('STARFRUIT', 'STARFRUIT', 'SEASHELLS'),
+        'ConversionObservation': (1100.5, 1102.5, 1.0, 9.5, -5.0, 2500.0, 80.0),
+        'Observation': ({}, {}),
+        'Order': ('STARFRUIT', 5000, 10),
+        'OrderDepth': (),
+        'Trade': ('STARFRUIT', 5000, 10, 'Remy', 'Vinnie', 100)}
+
+
+def object_size(obj) -> int:
+    """
+    Shallow memory of an object including its instance __dict__ if any
+
+    :param obj: Object to measure
+    :return: (int) Size in bytes
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def replay(module, ticks: int = TICKS) -> list:
+    """
+    Allocate the objects of a replay: per tick an order depth per symbol, an observation,
+    market trades and the orders of a trader, kept alive as a materialized backtest would
+
+    :param module: Module providing datamodel classes
+    :param ticks: (int) Number of ticks
+    :return: (list) Allocated objects
+    """
+    objects = []
+    for t in range(ticks):
+        timestamp = t * 100
+        for symbol in SYMBOLS:
+            order_depth = module.OrderDepth()
+            order_depth.buy_orders = {9998: 5, 9997: 10}
+            order_depth.sell_orders = {10002: -5, 10003: -10}
+            objects.append(order_depth)
+            objects.append(module.Order(symbol, 9999, 5))
+            objects.append(module.Order(symbol, 10001, -5))
+        conversion = module.ConversionObservation(1100.5, 1102.5, 1.0, 9.5, -5.0, 2500.0, 80.0)
+        objects.append(module.Observation({}, {'ORCHIDS': conversion}))
+        for _ in range(3):
+            objects.append(module.Trade('STARFRUIT', 5000, 1, 'Remy', 'Vinnie', timestamp))
+    return objects
+
+
+def measure_replay(module) -> tuple:
+    """
+    Measure time and peak memory of allocating a replay
+
+    :param module: Module providing datamodel classes
+    :return: (tuple) Elapsed seconds and peak memory in bytes
+    """
+    start = time.perf_counter()
+    objects = replay(module)
+    elapsed = time.perf_counter() - start
+    del objects
+
+    tracemalloc.start()  # separate run as tracing slows down allocation
+    objects = replay(module)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return elapsed, peak
+
+
+def main(number: int = 200000):
+    variants = {'dict': datamodel, 'slots': models}
+    print(f"{'class':<24}{'variant':<8}{'bytes':>8}{'init ns':>10}")
+    for name, args in ARGS.items():
+        for variant, module in variants.items():
+            cls = getattr(module, name)
+            size = object_size(cls(*args))
+            init_time = timeit.timeit(lambda: cls(*args), number=number) / number
+            print(f"{name:<24}{variant:<8}{size:>8}{init_time * 1e9:>10.0f}")
+
+    print(f"\n{TICKS} tick replay")
+    print(f"{'variant':<8}{'seconds':>10}{'peak MB':>10}")
+    for variant, module in variants.items():
+        elapsed, peak = measure_replay(module)
+        print(f"{variant:<8}{elapsed:>10.2f}{peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import statistics
+import timeit
+
+import numpy as np
+
+from round_5 import Greeks, ArrayGreeks
+
+
+def main(number: int = 100000):
+    xs = np.linspace(-8.0, 8.0, 100001)
+    exact = np.array([statistics.NormalDist().cdf(x) for x in xs])
+    print(f"max abs error of cdf: scalar {max(abs(Greeks.cdf(float(x)) - e) for x, e in zip(xs, exact)):.1e}, "
+          f"array {np.abs(ArrayGreeks.cdf(xs) - exact).max():.1e}")
+
+    print(f"\n{'case':<28}{'NormalDist ns':>14}{'Greeks ns':>12}{'speedup':>10}")
+    cases = {'cdf per tick': (lambda: statistics.NormalDist().cdf(0.3), lambda: Greeks.cdf(0.3)),
+             'cdf shared NormalDist': (lambda normal=statistics.NormalDist(): normal.cdf(0.3),
+                                       lambda: Greeks.cdf(0.3)),
+             'pdf per tick': (lambda: statistics.NormalDist().pdf(0.3), lambda: Greeks.pdf(0.3))}
+    for name, (baseline, kernel) in cases.items():
+        baseline_time = timeit.timeit(baseline, number=number) / number
+        kernel_time = timeit.timeit(kernel, number=number) / number
+        print(f"{name:<28}{baseline_time * 1e9:>14.0f}{kernel_time * 1e9:>12.0f}{baseline_time / kernel_time:>10.1f}")
+
+    # a day of d1 values of a single strike at once
+    d1 = xs[:10000]
+    baseline_time = timeit.timeit(lambda: [statistics.NormalDist().cdf(x) for x in d1.tolist()], number=1)
+    kernel_time = timeit.timeit(lambda: ArrayGreeks.cdf(d1), number=100) / 100
+    print(f"{'cdf of 10000 ticks':<28}{baseline_time * 1e9:>14.0f}{kernel_time * 1e9:>12.0f}"
+          f"{baseline_time / kernel_time:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
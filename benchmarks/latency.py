@@ -0,0 +1,185 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Iterator, Any
+
+from backtester.data import BookSnapshot
+from backtester.engine import Backtester, trader_factory
+from backtester.models import Trade, ConversionObservation
+from backtester.store import is_store, load_store
+from backtester.stream import Tick, day_ticks, stream_days
+
+ROUNDS = ['round_1', 'round_2', 'round_3', 'round_4', 'round_5']
+TIME_LIMIT_MS = 900  # response time of Trader.run allowed by the hosted platform
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines', 'latency.json')
+
+# mid price and half spread of each symbol of the synthetic stream
+SYNTHETIC = {'AMETHYSTS': (10000.0, 4),
+             'STARFRUIT': (5000.0, 3),
+             'ORCHIDS': (1100.0, 4),
+             'GIFT_BASKET': (70000.0, 6),
+             'CHOCOLATE': (8000.0, 1),
+             'STRAWBERRIES': (4000.0, 1),
+             'ROSES': (14500.0, 1),
+             'COCONUT': (10000.0, 1),
+             'COCONUT_COUPON': (637.0, 1)}
+
+
+class TimedTrader:
+    """
+    Trader wrapper recording the latency of Trader.run and the size of traderData at every tick
+    """
+    def __init__(self, trader: Any):
+        self.trader = trader
+        self.latencies: List[int] = []  # ns
+        self.sizes: List[int] = []  # bytes of traderData returned
+
+    def run(self, state):
+        start = time.perf_counter_ns()
+        orders, conversions, trader_data = self.trader.run(state)
+        self.latencies.append(time.perf_counter_ns() - start)
+        self.sizes.append(len(trader_data.encode()))
+        return orders, conversions, trader_data
+
+
+def synthetic_ticks(ticks: int, seed: int = 0) -> Iterator[Tick]:
+    """
+    Random walk books of every symbol with a few market trades and ORCHIDS observations
+
+    :param ticks: (int) Number of ticks
+    :param seed: (int) Random seed
+    :return: (Iterator[Tick]) Synthetic ticks
+    """
+    rng = random.Random(seed)
+    mids = {symbol: mid for symbol, (mid, _) in SYNTHETIC.items()}
+    for t in range(ticks):
+        timestamp = t * 100
+        books, trades = {}, {}
+        for symbol, (_, half_spread) in SYNTHETIC.items():
+            mids[symbol] += rng.gauss(0, half_spread / 2)
+            bid = round(mids[symbol]) - half_spread
+            ask = round(mids[symbol]) + half_spread
+            books[symbol] = BookSnapshot(((bid, rng.randint(1, 30)), (bid - 1, rng.randint(1, 30))),
+                                         ((ask, -rng.randint(1, 30)), (ask + 1, -rng.randint(1, 30))),
+                                         (bid + ask) / 2)
+            if rng.random() < 0.05:
+                trades[symbol] = [Trade(symbol, rng.choice((bid, ask)), rng.randint(1, 5), 'Remy', 'Vinnie', timestamp)]
+        orchids = mids['ORCHIDS']
+        observations = {'ORCHIDS': ConversionObservation(orchids - 1, orchids + 1, 1.0, 9.5, -5.0, 2500.0, 80.0)}
+        yield Tick(timestamp, books, trades, observations)
+
+
+def recorded_ticks(data_dir: str, day: int, ticks: int) -> List[Tick]:
+    """
+    First ticks of a recorded day from csv files or a tick store
+
+    :param data_dir: (str) Directory of csv files or tick store
+    :param day: (int) Day to replay
+    :param ticks: (int) Number of ticks
+    :return: (List[Tick]) Ticks, materialized so every round replays the same objects
+    """
+    if is_store(data_dir):
+        stream = day_ticks(load_store(data_dir, [day])[0])
+    else:
+        stream = next(stream_days(data_dir, [day]))[1]
+    return list(itertools.islice(stream, ticks))
+
+
+def percentile(values: List[int], q: float) -> int:
+    """
+    :return: (int) Nearest-rank percentile of values
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def measure(module_name: str, ticks: List[Tick]) -> Dict[str, float]:
+    """
+    Replay ticks through a fresh trader of a round twice: once for latency and traderData size,
+    and once under tracemalloc for peak memory, which would otherwise inflate the latencies
+
+    :param module_name: (str) Round module name
+    :param ticks: (List[Tick]) Ticks to replay
+    :return: (Dict[str, float]) Latency percentiles in microseconds, traderData bytes and peak memory in KB
+    """
+    factory = trader_factory(module_name)
+    timed = TimedTrader(factory())
+    Backtester(lambda: timed).run_stream([(0, ticks)])
+
+    trader = factory()
+    tracemalloc.start()
+    Backtester(lambda: trader).run_stream([(0, ticks)])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = timed.latencies
+    return {'p50_us': percentile(latencies, 0.50) / 1e3,
+            'p99_us': percentile(latencies, 0.99) / 1e3,
+            'max_us': max(latencies) / 1e3,
+            'trader_data_mean': sum(timed.sizes) / len(timed.sizes),
+            'trader_data_max': max(timed.sizes),
+            'peak_kb': peak / 1024}
+
+
+def diff(value: float, baseline: Dict[str, float], key: str) -> str:
+    """
+    :return: (str) Relative change against the baseline, blank without baseline
+    """
+    if not baseline or not baseline.get(key):
+        return ''
+    return f"{(value / baseline[key] - 1) * 100:+.0f}%"
+
+
+def main(argv=None):
+    sys.path.insert(0, os.getcwd())
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.latency',
+                                     description='Per-tick latency of Trader.run of every round against baselines')
+    parser.add_argument('--data', help='csv directory or tick store to replay, default synthetic ticks')
+    parser.add_argument('--day', type=int, default=0, help='recorded day to replay')
+    parser.add_argument('--ticks', type=int, default=1000, help='ticks to replay per round')
+    parser.add_argument('--rounds', nargs='+', default=ROUNDS, help='round modules to benchmark')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='json file of stored baselines')
+    parser.add_argument('--save', action='store_true', help='store the results as new baselines')
+    args = parser.parse_args(argv)
+
+    source = f"{args.data} day {args.day}" if args.data else 'synthetic'
+    ticks = recorded_ticks(args.data, args.day, args.ticks) if args.data else list(synthetic_ticks(args.ticks))
+    baselines = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    baseline = baselines.get(source, {}).get('rounds', {})
+
+    print(f"{source}, {len(ticks)} ticks, limit {TIME_LIMIT_MS} ms per tick")
+    print(f"{'round':<10}{'p50 us':>10}{'':>6}{'p99 us':>10}{'':>6}{'max us':>10}{'limit':>8}"
+          f"{'data B':>9}{'max B':>9}{'peak KB':>10}{'':>6}")
+    results = {}
+    for module_name in args.rounds:
+        stats = results[module_name] = measure(module_name, ticks)
+        base = baseline.get(module_name, {})
+        print(f"{module_name:<10}{stats['p50_us']:>10.1f}{diff(stats['p50_us'], base, 'p50_us'):>6}"
+              f"{stats['p99_us']:>10.1f}{diff(stats['p99_us'], base, 'p99_us'):>6}"
+              f"{stats['max_us']:>10.1f}{stats['max_us'] / (TIME_LIMIT_MS * 10):>7.2f}%"
+              f"{stats['trader_data_mean']:>9.0f}{stats['trader_data_max']:>9}"
+              f"{stats['peak_kb']:>10.0f}{diff(stats['peak_kb'], base, 'peak_kb'):>6}", flush=True)
+
+    if args.save:
+        baselines[source] = {'machine': f"{platform.machine()} {platform.processor()}".strip(),
+                             'python': platform.python_version(),
+                             'rounds': {name: {k: round(v, 1) for k, v in stats.items()}
+                                        for name, stats in results.items()}}
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"baselines saved to {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
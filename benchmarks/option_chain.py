@@ -0,0 +1,75 @@
+import math
+import random
+import statistics
+import timeit
+
+from round_5 import Greeks, IVSolver, OptionChain
+
+TRADING_DAYS = 250
+MATURITY = 246
+SOLVER = IVSolver()
+
+
+def scalar_features(s: float, c: float, k: float, root_tau: float) -> tuple:
+    """
+    Features of a single option computed with scalar math as OptionTrading does
+
+    :return: (tuple) Implied volatility, delta, gamma, vega
+    """
+    iv = SOLVER.solve(s, c, k, root_tau, Greeks.hallerbach_volatility(s, c, k, root_tau))
+    sigma_root_tau = iv * root_tau
+    d1 = math.log(s / k) / sigma_root_tau + 0.5 * sigma_root_tau
+    return iv, Greeks.delta(d1, True), Greeks.gamma(s, d1, sigma_root_tau), Greeks.vega(s, d1, root_tau)
+
+
+def call_price(s: float, k: float, root_tau: float, sigma: float = 0.16) -> float:
+    """
+    Black-Scholes-Merton call price with zero risk-free rate
+
+    :return: (float) Call price
+    """
+    d1 = (math.log(s / k) + 0.5 * (sigma * root_tau) ** 2) / (sigma * root_tau)
+    normal = statistics.NormalDist()
+    return s * normal.cdf(d1) - k * normal.cdf(d1 - sigma * root_tau)
+
+
+def build_chain(strikes: int, root_tau: float, s: float = 10000.0) -> tuple:
+    """
+    Build call prices of strikes spaced by 10 around the money
+
+    :param strikes: (int) Number of strikes
+    :return: (tuple) Strikes and call prices
+    """
+    ks = [s + 10 * (i - strikes // 2) for i in range(strikes)]
+    return ks, [call_price(s, k, root_tau) for k in ks]
+
+
+def main(number: int = 200):
+    random.seed(0)
+    root_tau = math.sqrt(MATURITY / TRADING_DAYS)
+    print(f"{'case':<20}{'scalar us':>12}{'vector us':>12}{'speedup':>10}")
+    for strikes in (1, 10, 100):
+        ks, cs = build_chain(strikes, root_tau)
+        scalar_time = timeit.timeit(lambda: [scalar_features(10000.0, c, k, root_tau) for k, c in zip(ks, cs)],
+                                    number=number) / number
+        vector_time = timeit.timeit(lambda: OptionChain(10000.0, cs, ks, root_tau), number=number) / number
+        print(f"{f'chain of {strikes}':<20}{scalar_time * 1e6:>12.1f}{vector_time * 1e6:>12.1f}"
+              f"{scalar_time / vector_time:>10.1f}")
+
+    # a day of ticks of a single strike as research scripts replay it
+    ticks = 10000
+    s, ss, cs, rts = 10000.0, [], [], []
+    for t in range(ticks):
+        s += random.gauss(0, 5)
+        ss.append(s)
+        cs.append(call_price(s, 10000.0, root_tau) + random.gauss(0, 1))
+        rts.append(math.sqrt((MATURITY + 1 - t / ticks) / TRADING_DAYS))
+    scalar_time = timeit.timeit(lambda: [scalar_features(s, c, 10000.0, r) for s, c, r in zip(ss, cs, rts)],
+                                number=1)
+    vector_time = timeit.timeit(lambda: OptionChain(ss, cs, 10000.0, rts), number=10) / 10
+    print(f"{f'day of {ticks} ticks':<20}{scalar_time * 1e6:>12.1f}{vector_time * 1e6:>12.1f}"
+          f"{scalar_time / vector_time:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import json
+import random
+import timeit
+
+from datamodel import *
+from round_5 import Logger, Trader
+
+SYMBOLS = Trader.symbols
+
+
+def build_state(timestamp: int = 100000) -> TradingState:
+    """
+    Build a state of all symbols with three levels per side, trades and conversion observation
+
+    :param timestamp: (int) Timestamp of the state
+    :return: (TradingState) Synthetic state
+    """
+    order_depths, market_trades, own_trades = {}, {}, {}
+    for i, symbol in enumerate(SYMBOLS):
+        mid = 1000 * (i + 1)
+        order_depth = OrderDepth()
+        order_depth.buy_orders = {mid - k: random.randint(1, 30) for k in range(1, 4)}
+        order_depth.sell_orders = {mid + k: -random.randint(1, 30) for k in range(1, 4)}
+        order_depths[symbol] = order_depth
+        market_trades[symbol] = [Trade(symbol, mid, 2, 'Remy', 'Vinnie', timestamp - 100)]
+        own_trades[symbol] = [Trade(symbol, mid - 1, 1, 'SUBMISSION', '', timestamp - 100)]
+    observation = ConversionObservation(1100.5, 1102.5, 1.0, 9.5, -5.0, 2500.0, 80.0)
+    return TradingState('~' + 'A' * 3000, timestamp,
+                        {symbol: Listing(symbol, symbol, 'SEASHELLS') for symbol in SYMBOLS},
+                        order_depths, own_trades, market_trades, {symbol: 5 for symbol in SYMBOLS},
+                        Observation({}, {'ORCHIDS': observation}))
+
+
+def reflective(state: TradingState, orders: dict, conversions: int, trader_data: str, logs: str,
+               max_log_length: int = 3750) -> str:
+    """
+    Serialize with json.dumps and ProsperityEncoder falling back to __dict__ of every object.\n
+    Free-text fields are truncated to the same budget as Logger, which needs a first pass to measure length.
+    """
+    def to_json(value):
+        return json.dumps(value, cls=ProsperityEncoder, separators=(',', ':'))
+
+    base_length = len(to_json([state.timestamp, state.listings, state.order_depths, state.own_trades,
+                               state.market_trades, state.position, state.observations, orders, conversions,
+                               "", "", ""]))
+    max_item_length = (max_log_length - base_length) // 3
+    return to_json([[state.timestamp, Logger.truncate(state.traderData, max_item_length), state.listings,
+                     state.order_depths, state.own_trades, state.market_trades, state.position, state.observations],
+                    orders, conversions, Logger.truncate(trader_data, max_item_length),
+                    Logger.truncate(logs, max_item_length)])
+
+
+def main(number: int = 5000):
+    random.seed(0)
+    state = build_state()
+    orders = {symbol: [Order(symbol, 1000, 5), Order(symbol, 1002, -5)] for symbol in SYMBOLS}
+    trader_data = state.traderData
+    logs = 'Market Make Bid 5 X @ 9998 Ask -5 X @ 10002\n' * 20
+    logger = Logger()
+    logger.logs = logs
+
+    paths = {'TradingState.toJSON': lambda: state.toJSON(),
+             'ProsperityEncoder': lambda: reflective(state, orders, 1, trader_data, logs, logger.max_log_length),
+             'Logger.serialize': lambda: logger.serialize(state, orders, 1, trader_data)}
+    print(f"{'path':<24}{'us':>10}{'chars':>10}")
+    for name, path in paths.items():
+        elapsed = timeit.timeit(path, number=number) / number
+        print(f"{name:<24}{elapsed * 1e6:>10.1f}{len(path()):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,743 @@
+import base64
+import json
 import math
-import statistics
-from typing import List, Dict, Tuple, Any
-from collections import deque, OrderedDict
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Dict, Tuple, Any, Union, Callable
+from collections import deque
 
 import jsonpickle
+import numpy as np
 
 from datamodel import *
 
 
+class RollingRegression:
+    """
+    Rolling window of values with simple linear regression of value over time in O(1).\n
+    Works as a queue like deque, and running sums of x, y, xy and x^2 are updated on append and popleft.\n
+    x is the tick of the value, e.g. timestamp // 100, kept with each value so a tick without value keeps
+    its spacing. Without x values are assumed to be stored every tick.
+    """
+    def __init__(self):
+        self.values = deque()
+        self.xs = deque()  # tick of each value
+        self.x_next = 0  # tick after the last appended value
+        self.sum_x = 0  # sums of x are integers and stay exact
+        self.sum_xx = 0
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def append(self, y: float, x: int = None):
+        """
+        Push new value to the right end of the window
+
+        :param y: (float) New value
+        :param x: (int) Tick of the value, default the tick after the last value
+        """
+        if x is None:
+            x = self.x_next
+        self.values.append(y)
+        self.xs.append(x)
+        self.x_next = x + 1
+        self.sum_x += x
+        self.sum_xx += x * x
+        self.sum_y += y
+        self.sum_xy += x * y
+
+    def popleft(self) -> float:
+        """
+        Pop the oldest value from the left end of the window
+
+        :return: (float) Popped value
+        """
+        x = self.xs.popleft()
+        y = self.values.popleft()
+        self.sum_x -= x
+        self.sum_xx -= x * x
+        self.sum_y -= y
+        self.sum_xy -= x * y
+        return y
+
+    def predict(self, shift: int = 1) -> float:
+        """
+        Predict value after n tick shift from the last value with least squares fit of the window
+
+        :param shift: (int) Number of ticks to predict ahead of the last value
+        :return: (float) Predicted value
+        """
+        n = len(self.values)
+        x = self.x_next - 1 + shift
+        denominator = n * self.sum_xx - self.sum_x ** 2
+        if denominator == 0:
+            return self.sum_y / n  # flat prediction with a single value
+        slope = (n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+        intercept = (self.sum_y - slope * self.sum_x) / n
+        return slope * x + intercept
+
+
+class RollingMoments:
+    """
+    Rolling window of values with mean and standard deviation in O(1).\n
+    Works as a queue like deque, and Welford's running mean and sum of squared deviations are updated
+    on append and reversed on popleft. Non-finite values are kept in the window but excluded from moments.
+    """
+    def __init__(self):
+        self.values = deque()
+        self.count = 0  # number of finite values in window
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from mean
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def append(self, x: float):
+        """
+        Push new value to the right end of the window
+
+        :param x: (float) New value
+        """
+        self.values.append(x)
+        if math.isfinite(x):
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+
+    def popleft(self) -> float:
+        """
+        Pop the oldest value from the left end of the window
+
+        :return: (float) Popped value
+        """
+        x = self.values.popleft()
+        if math.isfinite(x):
+            self.count -= 1
+            if self.count == 0:
+                self.mean = 0.0
+                self.m2 = 0.0
+            else:
+                delta = x - self.mean
+                self.mean -= delta / self.count
+                self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+        return x
+
+    def last(self) -> float:
+        """
+        Latest value of the window
+
+        :return: (float) Latest value, NaN if empty
+        """
+        return self.values[-1] if self.values else math.nan
+
+    def stdev(self) -> float:
+        """
+        Sample standard deviation of the window
+
+        :return: (float) Standard deviation, NaN with less than two values
+        """
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class EWMoments:
+    """
+    Exponentially weighted mean and standard deviation in O(1) without storing values.\n
+    Has the same queue interface as RollingMoments so it can replace it in Trader.data, where
+    popleft only shrinks the observation count as old values are already discounted by weight.\n
+    Optional prior mean and standard deviation start the moments as if span observations had been seen.
+    """
+    def __init__(self, span: int, mean: float = None, std: float = None):
+        self.alpha = 2 / (span + 1)  # smoothing factor from span as in pandas ewm
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        if mean is not None:
+            self.count = span
+            self.mean = mean
+            self.var = std ** 2 if std is not None else 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, x: float):
+        """
+        Update exponentially weighted moments with new value
+
+        :param x: (float) New value
+        """
+        if not math.isfinite(x):
+            return
+        if self.count == 0:
+            self.mean = x
+        else:
+            delta = x - self.mean
+            increment = self.alpha * delta
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + delta * increment)
+        self.count += 1
+
+    def popleft(self):
+        """
+        Shrink the observation count when the window is full
+        """
+        self.count = max(self.count - 1, 0)
+
+    def last(self) -> float:
+        """
+        Best estimate of the latest value as values are not stored
+
+        :return: (float) Exponentially weighted mean, NaN if empty
+        """
+        return self.mean if self.count else math.nan
+
+    def stdev(self) -> float:
+        """
+        Exponentially weighted standard deviation
+
+        :return: (float) Standard deviation, NaN with less than two values
+        """
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self.var)
+
+
+class StateCodec(ABC):
+    """
+    Abstract base class of codecs serializing Trader.data into traderData string and back
+    """
+    @abstractmethod
+    def encode(self, data: Dict[str, Any]) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, encoded: str) -> Dict[str, Any]:
+        pass
+
+
+class JsonPickleCodec(StateCodec):
+    """
+    Codec with jsonpickle which supports any object but produces verbose JSON with type tags
+    """
+    def encode(self, data: Dict[str, Any]) -> str:
+        return jsonpickle.encode(data, keys=True)
+
+    def decode(self, encoded: str) -> Dict[str, Any]:
+        return jsonpickle.decode(encoded, keys=True)
+
+
+class BinaryCodec(StateCodec):
+    """
+    Compact codec packing float series into base64 encoded binary with version header.\n
+    Layout: version (B), number of series (H), then per series: key length (B), key, type tag (B),
+    scalar fields of the type, then per window of the type: number of values (I) and values as array.\n
+    Data holding any other type is encoded with the fallback codec, and binary payload is marked with prefix.
+    """
+    PREFIX = '~'  # never the first character of JSON
+    VERSION = 2
+    HEADER = struct.Struct('<BH')
+    KEY = struct.Struct('<B')
+    TAG = struct.Struct('<B')
+    COUNT = struct.Struct('<I')
+    # type tag: (class, scalar fields, struct of scalar fields, (attribute, array typecode) of windows)
+    TYPES = {0: (deque, (), struct.Struct('<'), ((None, 'd'),)),  # None is the deque itself
+             1: (RollingRegression, ('x_next', 'sum_x', 'sum_xx', 'sum_y', 'sum_xy'), struct.Struct('<qqqdd'),
+                 (('xs', 'q'), ('values', 'd'))),
+             2: (RollingMoments, ('count', 'mean', 'm2'), struct.Struct('<qdd'), (('values', 'd'),)),
+             3: (EWMoments, ('alpha', 'count', 'mean', 'var'), struct.Struct('<dqdd'), ())}
+    TAGS = {spec[0]: tag for tag, spec in TYPES.items()}
+
+    def __init__(self, fallback: StateCodec = None):
+        self.fallback = fallback or JsonPickleCodec()
+
+    def encode(self, data: Dict[str, Any]) -> str:
+        try:
+            payload = self.pack(data)
+        except (KeyError, TypeError, AttributeError, struct.error, OverflowError):
+            return self.fallback.encode(data)  # unsupported type or value
+        return self.PREFIX + base64.b64encode(payload).decode('ascii')
+
+    def decode(self, encoded: str) -> Dict[str, Any]:
+        if not encoded.startswith(self.PREFIX):
+            return self.fallback.decode(encoded)
+        return self.unpack(base64.b64decode(encoded[len(self.PREFIX):]))
+
+    def pack(self, data: Dict[str, Any]) -> bytes:
+        """
+        Pack data into bytes, raising KeyError or TypeError for unsupported data
+
+        :param data: (Dict[str, Any]) Data to pack
+        :return: (bytes) Packed data
+        """
+        parts = [self.HEADER.pack(self.VERSION, len(data))]
+        for key, value in data.items():
+            tag = self.TAGS[type(value)]
+            cls, fields, layout, windows = self.TYPES[tag]
+            key_bytes = key.encode()
+            parts.append(self.KEY.pack(len(key_bytes)))
+            parts.append(key_bytes)
+            parts.append(self.TAG.pack(tag))
+            parts.append(layout.pack(*[getattr(value, field) for field in fields]))
+            for attribute, typecode in windows:
+                values = array(typecode, value if attribute is None else getattr(value, attribute))
+                if sys.byteorder == 'big':
+                    values.byteswap()  # always store little endian
+                parts.append(self.COUNT.pack(len(values)))
+                parts.append(values.tobytes())
+        return b''.join(parts)
+
+    def unpack(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Unpack bytes packed by pack method
+
+        :param payload: (bytes) Packed data
+        :return: (Dict[str, Any]) Unpacked data
+        """
+        version, size = self.HEADER.unpack_from(payload, 0)
+        if version != self.VERSION:
+            raise ValueError(f"Unsupported traderData version {version}")
+        offset = self.HEADER.size
+        data = {}
+        for _ in range(size):
+            (key_length,) = self.KEY.unpack_from(payload, offset)
+            offset += self.KEY.size
+            key = payload[offset:offset + key_length].decode()
+            offset += key_length
+            (tag,) = self.TAG.unpack_from(payload, offset)
+            offset += self.TAG.size
+            cls, fields, layout, windows = self.TYPES[tag]
+            scalars = layout.unpack_from(payload, offset)
+            offset += layout.size
+            value = None if cls is deque else cls.__new__(cls)
+            for field, scalar in zip(fields, scalars):
+                setattr(value, field, scalar)
+            for attribute, typecode in windows:
+                (count,) = self.COUNT.unpack_from(payload, offset)
+                offset += self.COUNT.size
+                values = array(typecode)
+                values.frombytes(payload[offset:offset + values.itemsize * count])
+                offset += values.itemsize * count
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                if attribute is None:
+                    value = deque(values)
+                else:
+                    setattr(value, attribute, deque(values))
+            data[key] = value
+        return data
+
+
+class DeltaPersistence:
+    """
+    Append-only persistence of Trader.data series into traderData.\n
+    traderData holds the sequence number of each series, values appended since the last full snapshot,
+    and the snapshot encoded with the state codec, which is refreshed only every snapshot interval.\n
+    Warm instance whose sequence numbers match traderData skips decoding, while cold instance rehydrates
+    by decoding the snapshot and replaying the appended values.
+    """
+    PREFIX = '#'
+    SEPARATOR = '|'  # sequence and appends are JSON of numbers, snapshot is the last field
+
+    def __init__(self, codec: StateCodec, snapshot_interval: int = 20):
+        self.codec = codec
+        self.snapshot_interval = snapshot_interval  # number of appends before a new full snapshot
+        self.seq: Dict[str, int] = {}  # sequence number of the last appended value of each series
+        self.appends: Dict[str, List[Tuple[float, int, int]]] = {}  # (value, max size, x) appended since snapshot
+        self.num_appends = 0
+        self.snapshot = ''  # encoded full snapshot
+
+    @staticmethod
+    def push(series, value: float, max_size: int = None, x: int = None):
+        """
+        Append value to series popping oldest values to keep the max size
+
+        :param series: Queue of values with append and popleft
+        :param value: (float) Value to append
+        :param max_size: (int) Maximum size of the series, default None
+        :param x: (int) Tick of the value for series regressed over time, e.g. RollingRegression, default None
+        """
+        if max_size:
+            while len(series) >= max_size:
+                series.popleft()
+        if x is None:
+            series.append(value)
+        else:
+            series.append(value, x)
+
+    def record(self, key: str, value: float, max_size: int = None, x: int = None):
+        """
+        Record value appended to a series after the last snapshot
+
+        :param key: (str) Key of the series in data
+        :param value: (float) Appended value
+        :param max_size: (int) Maximum size of the series used on append
+        :param x: (int) Tick of the value used on append
+        """
+        self.seq[key] = self.seq.get(key, 0) + 1
+        self.appends.setdefault(key, []).append((value, max_size or 0, x))
+        self.num_appends += 1
+
+    def encode(self, data: Dict[str, Any]) -> str:
+        """
+        Encode data into traderData, taking a new full snapshot only if snapshot interval is reached
+
+        :param data: (Dict[str, Any]) Trader data
+        :return: (str) traderData
+        """
+        if not self.snapshot or self.num_appends >= self.snapshot_interval:
+            self.snapshot = self.codec.encode(data)
+            self.appends = {}
+            self.num_appends = 0
+        return (self.PREFIX + json.dumps(self.seq) + self.SEPARATOR + json.dumps(self.appends)
+                + self.SEPARATOR + self.snapshot)
+
+    def restore(self, encoded: str, data: Dict[str, Any]) -> bool:
+        """
+        Restore data in place from traderData unless data in memory is already current
+
+        :param encoded: (str) traderData of the last timestamp
+        :param data: (Dict[str, Any]) Trader data to restore in place
+        :return: (bool) True if data was decoded
+        """
+        if not encoded:
+            return False
+        if not encoded.startswith(self.PREFIX):
+            restored = self.codec.decode(encoded)  # plain payload written by the codec itself
+            data.clear()
+            data.update(restored)
+            return True
+
+        seq_end = encoded.index(self.SEPARATOR)
+        seq = json.loads(encoded[len(self.PREFIX):seq_end])
+        if seq == self.seq:
+            return False  # warm instance, skip decode
+        appends_end = encoded.index(self.SEPARATOR, seq_end + 1)
+        appends = json.loads(encoded[seq_end + 1:appends_end])
+        snapshot = encoded[appends_end + 1:]
+
+        restored = self.codec.decode(snapshot)
+        for key, values in appends.items():
+            for value, max_size, x in values:
+                self.push(restored[key], value, max_size, x)
+        data.clear()
+        data.update(restored)
+
+        # continue appending on top of the restored snapshot
+        self.seq = seq
+        self.appends = {key: [tuple(v) for v in values] for key, values in appends.items()}
+        self.num_appends = sum(len(values) for values in appends.values())
+        self.snapshot = snapshot
+        return True
+
+
+class Logger:
+    """
+    Level-gated logger buffering messages of a timestamp and flushing them once per timestamp.\n
+    Messages are given as a code of MESSAGES and arguments, and formatted only if the level is enabled.
+    In compact mode a message is kept as code and arguments, which can be expanded later with expand.
+    Messages over the per-timestamp budget are dropped and counted.\n
+    On flush, state, orders and logs of a timestamp are serialized into the compressed layout of the visualizer:\n
+    [[timestamp, traderData, listings, order_depths, own_trades, market_trades, position, observations],
+    orders, conversions, traderData, logs]\n
+    Each field is flattened by schema into lists and dicts of primitives, so JSON is encoded in C without
+    reflection, and traderData and logs are truncated to fit the log length budget.
+    """
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    OFF = 100
+
+    MESSAGES = {'POS': '{} Position {}',
+                'SS': 'Scratch Sell {} X @ {}',
+                'SB': 'Scratch Buy {} X @ {}',
+                'SLS': 'Stop Loss Sell {} X @ {}',
+                'SLB': 'Stop Loss Buy {} X @ {}',
+                'MM': 'Market Make Bid {} X @ {} Ask {} X @ {}',
+                'LAE': 'Long Arbitrage Enter {} X @ {}',
+                'SAE': 'Short Arbitrage Enter {} X @ {}',
+                'LAX': 'Long Arbitrage Exit {} X @ {}',
+                'SAX': 'Short Arbitrage Exit {} X @ {}',
+                'ARB': 'Arbitrage Ladder {} Levels Edge {:.1f}',
+                'IV': 'IV: {:.4f} Z-Score {:.2f} Take {} X @ {}',
+                'DH': 'Delta Hedge {} X @ {}',
+                'SHED': 'Shed {} at {:.1f} ms Estimate {:.1f} ms'}
+
+    def __init__(self, level: int = INFO, compact: bool = True, state_output: bool = True,
+                 max_log_length: int = 3750):
+        self.level = level  # messages below this level are ignored before formatting
+        self.compact = compact  # keep code and arguments instead of formatted text
+        self.state_output = state_output  # print visualizer line with state, otherwise only logs
+        self.max_log_length = max_log_length  # budget of characters printed per timestamp
+        self.buffer: List[str] = []
+        self.buffer_length = 0
+        self.dropped = 0  # messages dropped over budget in this timestamp
+        self.logs = ""
+        self.encoder = json.JSONEncoder(separators=(',', ':'))
+        self.listings_key = None  # listings do not change over timestamps, so encoded once
+        self.listings_json = ''
+        self.trader_data_key = None  # traderData of the state is the one submitted at last timestamp
+        self.trader_data_json = ''
+
+    def log(self, level: int, code: str, *args):
+        """
+        Buffer message if level is enabled and per-timestamp budget is left
+
+        :param level: (int) Level of the message
+        :param code: (str) Code of the message template in MESSAGES
+        :param args: Arguments of the message template
+        """
+        if level < self.level:
+            return
+        if self.buffer_length >= self.max_log_length:
+            self.dropped += 1
+            return
+        if self.compact:
+            message = ' '.join([code, *map(str, args)])
+        else:
+            message = self.MESSAGES[code].format(*args)
+        self.buffer.append(message)
+        self.buffer_length += len(message) + 1
+
+    def debug(self, code: str, *args):
+        self.log(self.DEBUG, code, *args)
+
+    def info(self, code: str, *args):
+        self.log(self.INFO, code, *args)
+
+    @classmethod
+    def expand(cls, logs: str) -> str:
+        """
+        Expand compact logs into formatted messages
+
+        :param logs: (str) Logs written in compact mode
+        :return: (str) Formatted logs, lines which are not compact messages are kept as they are
+        """
+        lines = []
+        for line in logs.split('\n'):
+            code, *args = line.split(' ')
+            if code not in cls.MESSAGES:
+                lines.append(line)
+                continue
+            values = []
+            for arg in args:
+                try:
+                    values.append(int(arg))
+                except ValueError:
+                    try:
+                        values.append(float(arg))
+                    except ValueError:
+                        values.append(arg)
+            lines.append(cls.MESSAGES[code].format(*values))
+        return '\n'.join(lines)
+
+    def flush(self, state: TradingState, orders: Dict[Symbol, List[Order]], conversions: int, trader_data: str):
+        """
+        Print buffered logs of the timestamp with a single print and clear the buffer
+
+        :param state: (TradingState) State of the timestamp
+        :param orders: (Dict[Symbol, List[Order]]) Orders submitted for the timestamp
+        :param conversions: (int) Conversions submitted for the timestamp
+        :param trader_data: (str) traderData submitted for the timestamp
+        """
+        if self.dropped:
+            self.buffer.append(f"... {self.dropped} messages dropped")
+        self.logs = '\n'.join(self.buffer)
+        if self.state_output:
+            print(self.serialize(state, orders, conversions, trader_data))
+        elif self.logs:
+            print(self.logs)
+        self.buffer = []
+        self.buffer_length = 0
+        self.dropped = 0
+        self.logs = ""
+
+    def serialize(self, state: TradingState, orders: Dict[Symbol, List[Order]], conversions: int,
+                  trader_data: str) -> str:
+        """
+        Serialize timestamp to JSON truncating traderData and logs equally to fit the budget
+
+        :return: (str) Serialized JSON line
+        """
+        encode = self.encoder.encode
+        listings_key = tuple(state.listings)
+        if listings_key != self.listings_key:
+            self.listings_key = listings_key
+            self.listings_json = encode(self.compress_listings(state.listings))
+
+        # everything except the three free-text fields is encoded once
+        state_body = encode([self.compress_order_depths(state.order_depths),
+                             self.compress_trades(state.own_trades),
+                             self.compress_trades(state.market_trades),
+                             state.position,
+                             self.compress_observations(state.observations)])
+        orders_body = encode(self.compress_orders(orders))
+        head = '[[' + str(state.timestamp) + ','
+        middle = (',' + self.listings_json + ',' + state_body[1:] + ',' + orders_body + ','
+                  + str(conversions) + ',')
+
+        # length of the line with three empty strings decides the room left for free-text fields
+        base_length = len(head) + len(middle) + 2 * 3 + 2
+        max_item_length = max((self.max_log_length - base_length) // 3, 0)
+        if (state.traderData, max_item_length) == self.trader_data_key:
+            state_trader_data = self.trader_data_json
+        else:
+            state_trader_data = self.encode_truncated(state.traderData, max_item_length)
+        trader_data_json = self.encode_truncated(trader_data, max_item_length)
+        self.trader_data_key = (trader_data, max_item_length)
+        self.trader_data_json = trader_data_json
+        return (head + state_trader_data + middle + trader_data_json + ','
+                + self.encode_truncated(self.logs, max_item_length) + ']')
+
+    def encode_truncated(self, value: str, max_length: int) -> str:
+        """
+        Encode string to JSON truncated so the encoded content without quotes fits max_length.\n
+        Escapes (newlines of logs, quotes of JSON traderData) make the encoded string longer than the raw one,
+        so the cut is shortened in proportion to the excess until the encoded length fits.
+
+        :param value: (str) String to encode
+        :param max_length: (int) Budget of encoded characters between the quotes
+        :return: (str) JSON string literal
+        """
+        cut = max_length
+        while cut > 0:
+            encoded = self.encoder.encode(self.truncate(value, cut))
+            length = len(encoded) - 2
+            if length <= max_length:
+                return encoded
+            cut = min(cut - 1, cut * max_length // length)
+        return '""'
+
+    @staticmethod
+    def compress_listings(listings: Dict[Symbol, Listing]) -> List[List[Any]]:
+        return [[listing.symbol, listing.product, listing.denomination] for listing in listings.values()]
+
+    @staticmethod
+    def compress_order_depths(order_depths: Dict[Symbol, OrderDepth]) -> Dict[Symbol, List[Any]]:
+        return {symbol: [depth.buy_orders, depth.sell_orders] for symbol, depth in order_depths.items()}
+
+    @staticmethod
+    def compress_trades(trades: Dict[Symbol, List[Trade]]) -> List[List[Any]]:
+        return [[t.symbol, t.price, t.quantity, t.buyer, t.seller, t.timestamp]
+                for symbol_trades in trades.values() for t in symbol_trades]
+
+    @staticmethod
+    def compress_observations(observations: Observation) -> List[Any]:
+        conversion_observations = {product: [o.bidPrice, o.askPrice, o.transportFees, o.exportTariff,
+                                             o.importTariff, o.sunlight, o.humidity]
+                                   for product, o in observations.conversionObservations.items()}
+        return [observations.plainValueObservations, conversion_observations]
+
+    @staticmethod
+    def compress_orders(orders: Dict[Symbol, List[Order]]) -> List[List[Any]]:
+        return [[o.symbol, o.price, o.quantity] for symbol_orders in orders.values() for o in symbol_orders]
+
+    @staticmethod
+    def truncate(value: str, max_length: int) -> str:
+        if len(value) <= max_length:
+            return value
+        return value[:max(max_length - 3, 0)] + '...'
+
+
+class OrderBook:
+    """
+    Sorted view of OrderDepth with parallel price and quantity lists of each side, best level first.\n
+    Best and worst prices, volumes, sweep notional and VWAP of both sides are built in a single pass.
+    """
+    def __init__(self, order_depth: OrderDepth):
+        self.bids = order_depth.buy_orders  # shared with order depth, not copied
+        self.asks = order_depth.sell_orders
+        self.bid_prices = sorted(self.bids, reverse=True)
+        self.ask_prices = sorted(self.asks)
+        self.bid_quantities = []
+        self.ask_quantities = []
+
+        bid_volume = bid_sweep = 0
+        for price in self.bid_prices:
+            quantity = self.bids[price]
+            self.bid_quantities.append(quantity)
+            bid_volume += quantity
+            bid_sweep += price * quantity
+        ask_volume = ask_sweep = 0
+        for price in self.ask_prices:
+            quantity = self.asks[price]
+            self.ask_quantities.append(quantity)
+            ask_volume += quantity
+            ask_sweep += price * quantity
+        self.bid_volume = bid_volume  # sum of all quantities of bids
+        self.ask_volume = ask_volume
+        self.bid_sweep = bid_sweep  # amount needed to sweep all bids
+        self.ask_sweep = ask_sweep
+
+        # prevent data corruption from empty side by using prices of the other side
+        if self.bid_prices:
+            self.best_bid = self.bid_prices[0]
+            self.worst_bid = self.bid_prices[-1]
+        else:
+            self.best_bid = self.ask_prices[0]
+            self.worst_bid = self.ask_prices[-1]
+        if self.ask_prices:
+            self.best_ask = self.ask_prices[0]
+            self.worst_ask = self.ask_prices[-1]
+        else:
+            self.best_ask = self.bid_prices[-1]
+            self.worst_ask = self.bid_prices[0]
+
+        # volume weighted average (VWAP), worst price for some occurrence of zero volume
+        self.bid_vwap = bid_sweep / bid_volume if bid_volume else self.worst_bid
+        self.ask_vwap = ask_sweep / ask_volume if ask_volume else self.worst_ask
+        self.mid_vwap = (self.bid_vwap + self.ask_vwap) / 2  # de-noised mid-price
+
+
+class FeatureStore:
+    """
+    Per-timestamp cache of order book features keyed by symbol shared by all strategies of a timestamp.\n
+    Cache is invalidated automatically when a state of a new timestamp is seen.
+    """
+    def __init__(self):
+        self.timestamp = None
+        self.order_depths = None  # order depths of the cached state
+        self.books: Dict[Symbol, OrderBook] = {}
+
+    def book(self, state: TradingState, symbol: Symbol) -> OrderBook:
+        """
+        Get order book features of a symbol, built only once per timestamp
+
+        :param state: (TradingState) Trading state of the timestamp
+        :param symbol: (Symbol) Symbol of the order book
+        :return: (OrderBook) Order book features of the symbol
+        """
+        if state.timestamp != self.timestamp or state.order_depths is not self.order_depths:
+            self.timestamp = state.timestamp
+            self.order_depths = state.order_depths
+            self.books = {}
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(state.order_depths[symbol])
+        return book
+
+
 class Strategy:
     """
     Base Class for Strategy Objects
     """
-    def __init__(self, state: TradingState, product_config: dict):
+    features = FeatureStore()  # order book features shared by strategies of the same timestamp
+    def __init__(self, state: TradingState, product_config: dict, logger: Logger = None):
+        # logger of the trader buffering messages until Trader.run flushes them, own logger if not given
+        self.logger = logger if logger is not None else Logger()
+
         # product configuration
         self.symbol: Symbol = product_config['SYMBOL']
         self.product: Product = product_config['PRODUCT']
@@ -22,38 +747,22 @@ class Strategy:
         self.timestamp = state.timestamp
         self.position = state.position.get(self.product, 0)
 
-        # prevent reshuffling of order depth
-        self.bids = OrderedDict(state.order_depths[self.symbol].buy_orders)
-        self.asks = OrderedDict(state.order_depths[self.symbol].sell_orders)
-
-        # build order book features
-        try:
-            self.best_bid = max(self.bids.keys())
-            self.worst_bid = min(self.bids.keys())
-        except ValueError:
-            self.best_bid = min(self.asks.keys())  # prevent data corruption from empty bid
-            self.worst_bid = max(self.asks.keys())
-
-        try:
-            self.best_ask = min(self.asks.keys())
-            self.worst_ask = max(self.asks.keys())
-        except ValueError:
-            self.best_ask = min(self.bids.keys())
-            self.worst_ask = max(self.bids.keys())
-
-        self.bid_volume = sum(self.bids.values())  # sum of all quantities of bids
-        self.ask_volume = sum(self.asks.values())
-        self.bid_sweep = sum(p * q for p, q in self.bids.items())  # amount needed to sweep all bids
-        self.ask_sweep = sum(p * q for p, q in self.asks.items())
-        try:
-            self.bid_vwap = self.bid_sweep / self.bid_volume  # volume weighted average (VWAP) of bids
-        except ZeroDivisionError:
-            self.bid_vwap = self.worst_bid  # some occurrence of zero volume
-        try:
-            self.ask_vwap = self.ask_sweep / self.ask_volume
-        except ZeroDivisionError:
-            self.ask_vwap = self.worst_ask
-        self.mid_vwap = (self.bid_vwap + self.ask_vwap) / 2  # de-noised mid-price
+        # read order book features built once per timestamp without copying order depth
+        book = self.features.book(state, self.symbol)
+        self.book = book
+        self.bids = book.bids
+        self.asks = book.asks
+        self.best_bid = book.best_bid
+        self.worst_bid = book.worst_bid
+        self.best_ask = book.best_ask
+        self.worst_ask = book.worst_ask
+        self.bid_volume = book.bid_volume  # sum of all quantities of bids
+        self.ask_volume = book.ask_volume
+        self.bid_sweep = book.bid_sweep  # amount needed to sweep all bids
+        self.ask_sweep = book.ask_sweep
+        self.bid_vwap = book.bid_vwap  # volume weighted average (VWAP) of bids
+        self.ask_vwap = book.ask_vwap
+        self.mid_vwap = book.mid_vwap  # de-noised mid-price
 
         # initialize variables for orders
         self.orders: List[Order] = []  # append orders for this product here
@@ -69,8 +778,8 @@ class MarketMaking(Strategy):
     Sub-Strategy 2: Stop loss if inventory piles over certain level\n
     Sub-Strategy 3: Market make around fair value with inventory management
     """
-    def __init__(self, state: TradingState, product_config: dict, strategy_config: dict):
-        super().__init__(state, product_config)
+    def __init__(self, state: TradingState, product_config: dict, strategy_config: dict, logger: Logger = None):
+        super().__init__(state, product_config, logger)
 
         # strategy configuration
         self.fair_value: float = strategy_config['FAIR_VALUE']  # initial or fixed fair value for market making
@@ -93,7 +802,7 @@ class MarketMaking(Strategy):
                 self.orders.append(Order(self.symbol, self.best_bid, order_quantity))
                 self.expected_position += order_quantity
                 self.sum_sell_qty += order_quantity
-                print(f"Scratch Sell {order_quantity} X @ {self.best_bid}")
+                self.logger.info('SS', order_quantity, self.best_bid)
 
             elif self.best_ask <= reserve_price and len(self.asks) >= 2:
                 # trade (buy) against bots trying to sell to cheap but not against worst ask
@@ -102,7 +811,7 @@ class MarketMaking(Strategy):
                 self.orders.append(Order(self.symbol, self.best_ask, order_quantity))
                 self.expected_position += order_quantity
                 self.sum_buy_qty += order_quantity
-                print(f"Scratch Buy {order_quantity} X @ {self.best_ask}")
+                self.logger.info('SB', order_quantity, self.best_ask)
 
     def stop_loss(self, ignore_worst=True):
         """
@@ -116,7 +825,7 @@ class MarketMaking(Strategy):
                 self.orders.append(Order(self.symbol, self.best_bid, order_quantity))
                 self.expected_position += order_quantity
                 self.sum_sell_qty += order_quantity
-                print(f"Stop Loss Sell {order_quantity} X @ {self.best_bid}")
+                self.logger.info('SLS', order_quantity, self.best_bid)
 
         elif self.position < -self.sl_inventory and self.best_ask <= self.fair_value + self.sl_spread:
             # stop loss buy not too expensive when in short position over acceptable inventory
@@ -126,7 +835,7 @@ class MarketMaking(Strategy):
                 self.orders.append(Order(self.symbol, self.best_ask, order_quantity))
                 self.expected_position += order_quantity
                 self.sum_buy_qty += order_quantity
-                print(f"Stop Loss Buy {order_quantity} X @ {self.best_ask}")
+                self.logger.info('SLB', order_quantity, self.best_ask)
 
     def market_make(self):
         """
@@ -153,7 +862,7 @@ class MarketMaking(Strategy):
         ask_price = math.floor(self.fair_value + self.mm_spread)
         self.orders.append(Order(self.symbol, bid_price, bid_quantity))
         self.orders.append(Order(self.symbol, ask_price, ask_quantity))
-        print(f"Market Make Bid {bid_quantity} X @ {bid_price} Ask {ask_quantity} X @ {ask_price}")
+        self.logger.info('MM', bid_quantity, bid_price, ask_quantity, ask_price)
 
     def aggregate_orders(self, ignore_worst_sl=True) -> List[Order]:
         """
@@ -162,7 +871,7 @@ class MarketMaking(Strategy):
         :rtype: List[Order]
         :return: List of orders generated for product
         """
-        print(f"{self.symbol} Position {self.position}")
+        self.logger.info('POS', self.symbol, self.position)
         self.scratch_under_valued()
         self.stop_loss(ignore_worst_sl)
         self.market_make()
@@ -174,28 +883,22 @@ class LinearRegressionMM(MarketMaking):
     Market making based on prediction of price with simple linear regression of price over time
     """
     def __init__(self, state: TradingState,
-                 product_config: dict, strategy_config: dict):
-        super().__init__(state, product_config, strategy_config)
+                 product_config: dict, strategy_config: dict, logger: Logger = None):
+        super().__init__(state, product_config, strategy_config, logger)
 
         # strategy configuration
         self.min_window_size = strategy_config['MIN_WINDOW_SIZE']
         self.max_window_size = strategy_config['MAX_WINDOW_SIZE']
         self.predict_shift = strategy_config['PREDICT_SHIFT']
 
-    def predict_price(self, price_history: deque):
+    def predict_price(self, price_history: RollingRegression):
         """
         Predict price value after n timestamp shift with linear regression and update fair value
 
-        :param price_history: (deque) Array of historical prices
+        :param price_history: (RollingRegression) Rolling window of historical prices with regression sums
         """
-        n = len(price_history)
-        if n >= self.min_window_size:
-            t = int(self.timestamp / 100)
-            xs = [100 * i for i in range(t - n + 1, t + 1)]
-            ys = list(price_history)
-            slope, intercept = statistics.linear_regression(xs, ys)
-            y_hat = slope * (self.timestamp + 100 * self.predict_shift) + intercept
-            self.fair_value = y_hat
+        if len(price_history) >= self.min_window_size:
+            self.fair_value = price_history.predict(self.predict_shift)
         else:
             self.fair_value = self.mid_vwap
 
@@ -208,8 +911,8 @@ class OTCArbitrage(Strategy):
     Sub-Strategy 3: Convert remaining position to exit arbitrage position
     """
     def __init__(self, state: TradingState,
-                 product_config: dict, strategy_config: dict):
-        super().__init__(state, product_config)
+                 product_config: dict, strategy_config: dict, logger: Logger = None):
+        super().__init__(state, product_config, logger)
         self.unit_cost_storing = product_config['COST_STORING']
 
         # extract information from conversion observation
@@ -230,6 +933,34 @@ class OTCArbitrage(Strategy):
         self.min_edge = strategy_config['MIN_EDGE']  # only try market taking arbitrage over this edge
         self.mm_edge = strategy_config['MM_EDGE']  # edge added to arbitrage free pricing for market making
 
+    @staticmethod
+    def take_ladder(prices: List[int], quantities: List[int], reference: float, direction: int,
+                    min_edge: float, headroom: int) -> Tuple[List[Tuple[int, int]], float]:
+        """
+        Walk price levels from best to worst in a single pass, taking the full volume of each level whose edge
+        over the arbitrage free reference price is at least min edge until limit headroom runs out.\n
+        Edge only shrinks deeper in the book, so greedy take of profitable levels maximizes cumulative edge.
+
+        :param prices: (List[int]) Prices of a side, best level first
+        :param quantities: (List[int]) Quantities of the levels, negative for asks
+        :param reference: (float) Arbitrage free price to close the position in otc
+        :param direction: (int) 1 to buy asks, -1 to sell bids
+        :param min_edge: (float) Minimum edge per unit to take a level
+        :param headroom: (int) Absolute quantity left until position limit
+        :return: (Tuple[List[Tuple[int, int]], float]) (price, absolute quantity) per level, and cumulative edge
+        """
+        takes = []
+        cumulative_edge = 0.0
+        for price, quantity in zip(prices, quantities):
+            edge = direction * (reference - price)
+            if edge < min_edge or headroom <= 0:
+                break
+            take = min(abs(quantity), headroom)
+            takes.append((price, take))
+            cumulative_edge += edge * take
+            headroom -= take
+        return takes, cumulative_edge
+
     def arbitrage_exchange_enter(self):
         """
         Long Arbitrage: take exchange good ask (buy) then take next otc bid (sell)\n
@@ -237,33 +968,33 @@ class OTCArbitrage(Strategy):
         Note you pay export storing cost for long arb but only import cost for short arb
         """
         # calculate effective import and export cost then get arbitrage edge of each side
-        long_arb_edge = self.otc_bid - self.best_ask - self.effective_cost_export
-        short_arb_edge = self.best_bid - self.otc_ask - self.cost_import
-
-        edges = {"Long": long_arb_edge, "Short": short_arb_edge}
-        max_key = max(edges, key=lambda k: edges[k])  # choose best side
-        if max_key == "Long" and edges[max_key] >= self.min_edge:
-            for price, quantity in self.asks.items():
-                if self.otc_bid - price - self.effective_cost_export >= self.min_edge:
-                    order_quantity = max(min(-quantity,
-                                             self.position_limit - max(self.expected_position, 0)), 0)
-                    self.orders.append(Order(self.symbol, price, order_quantity))
-                    print(f"{max_key} Arbitrage {order_quantity} X @ {self.best_ask}")
-                    self.expected_position += order_quantity
-                    self.sum_buy_qty += order_quantity
-                else:
-                    break
-        elif max_key == "Short" and edges[max_key] >= self.min_edge:
-            for price, quantity in self.bids.items():
-                if price - self.otc_ask - self.cost_import >= self.min_edge:
-                    order_quantity = min(max(-self.bids[self.best_bid],
-                                             -self.position_limit - min(self.expected_position, 0)), 0)
-                    self.orders.append(Order(self.symbol, self.best_bid, order_quantity))
-                    print(f"{max_key} Arbitrage Enter {order_quantity} X @ {self.best_bid}")
-                    self.expected_position += order_quantity
-                    self.sum_sell_qty += order_quantity
-                else:
-                    break
+        bid_arb_free = self.otc_bid - self.effective_cost_export
+        ask_arb_free = self.otc_ask + self.cost_import
+        long_arb_edge = bid_arb_free - self.best_ask
+        short_arb_edge = self.best_bid - ask_arb_free
+
+        # choose best side and take every profitable level within limit headroom, one order per level
+        if long_arb_edge >= short_arb_edge and long_arb_edge >= self.min_edge:
+            headroom = self.position_limit - max(self.expected_position, 0)
+            takes, cumulative_edge = self.take_ladder(self.book.ask_prices, self.book.ask_quantities,
+                                                      bid_arb_free, 1, self.min_edge, headroom)
+            for price, order_quantity in takes:
+                self.orders.append(Order(self.symbol, price, order_quantity))
+                self.logger.info('LAE', order_quantity, price)
+                self.expected_position += order_quantity
+                self.sum_buy_qty += order_quantity
+            self.logger.debug('ARB', len(takes), cumulative_edge)
+        elif short_arb_edge > long_arb_edge and short_arb_edge >= self.min_edge:
+            headroom = self.position_limit + min(self.expected_position, 0)
+            takes, cumulative_edge = self.take_ladder(self.book.bid_prices, self.book.bid_quantities,
+                                                      ask_arb_free, -1, self.min_edge, headroom)
+            for price, quantity in takes:
+                order_quantity = -quantity
+                self.orders.append(Order(self.symbol, price, order_quantity))
+                self.logger.info('SAE', order_quantity, price)
+                self.expected_position += order_quantity
+                self.sum_sell_qty += order_quantity
+            self.logger.debug('ARB', len(takes), cumulative_edge)
 
     def market_make(self):
         """
@@ -287,7 +1018,7 @@ class OTCArbitrage(Strategy):
         ask_price = math.ceil(ask_arb_free + self.mm_edge)
         self.orders.append(Order(self.symbol, bid_price, bid_quantity))
         self.orders.append(Order(self.symbol, ask_price, ask_quantity))
-        print(f"Market Make Bid {bid_quantity} X @ {bid_price} Ask {ask_quantity} X @ {ask_price}")
+        self.logger.info('MM', bid_quantity, bid_price, ask_quantity, ask_price)
 
     def arbitrage_otc_exit(self):
         """
@@ -295,9 +1026,9 @@ class OTCArbitrage(Strategy):
         """
         self.conversions = -self.position
         if self.conversions > 0:
-            print(f"Short Arbitrage Exit {self.conversions} X @ {self.otc_ask}")
+            self.logger.info('SAX', self.conversions, self.otc_ask)
         elif self.conversions < 0:
-            print(f"Long Arbitrage Exit {self.conversions} X @ {self.otc_bid}")
+            self.logger.info('LAX', self.conversions, self.otc_bid)
 
     def aggregate_orders_conversions(self) -> Tuple[List[Order], int]:
         """
@@ -306,13 +1037,114 @@ class OTCArbitrage(Strategy):
         :rtype: List[Order]
         :return: List of orders generated for product
         """
-        print(f"{self.symbol} Position {self.position}")
+        self.logger.info('POS', self.symbol, self.position)
         self.arbitrage_exchange_enter()
         self.market_make()
         self.arbitrage_otc_exit()
         return self.orders, self.conversions
 
 
+class BasketEngine:
+    """
+    Vectorized NAV, premium and z-score of baskets sharing a universe of constituents.\n
+    Rows of the weight matrix are baskets and columns are constituents, so all baskets of a timestamp are priced
+    with a single matrix product, and tradable basket limits are derived once from the matrix.\n
+    Premium priors are read from the strategy config whenever they are used, so the config stays the source of truth.
+    """
+    features = Strategy.features  # mid-prices come from order book features shared with strategies
+
+    def __init__(self, baskets: List[Symbol], constituents: List[Symbol], weights: np.ndarray,
+                 basket_limits: List[Position], constituent_limits: List[Position], strategy_config: dict):
+        self.baskets = baskets
+        self.constituents = constituents
+        self.index = {symbol: i for i, symbol in enumerate(baskets)}  # row of each basket
+        self.weights = weights  # units of each constituent per basket
+        self.strategy_config = strategy_config  # Trader.config['STRATEGY'] with PREMIUM_MEAN, PREMIUM_STD, PREMIUM_SPAN
+
+        # max basket constituent pairs, binding constituent of each basket caps number of baskets to hedge
+        with np.errstate(divide='ignore'):
+            pair_limits = np.where(weights > 0, np.array(constituent_limits, dtype=float) / weights, np.inf)
+        self.basket_limits = np.minimum(np.floor(pair_limits.min(axis=1)), basket_limits).astype(int).tolist()
+
+        # features of the last updated timestamp
+        self.nav: List[float] = []
+        self.premium: List[float] = []
+        self.premium_mean: List[float] = []  # mean premium of basket over constituents
+        self.premium_std: List[float] = []
+        self.z_score: List[float] = []
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'BasketEngine':
+        """
+        Build engine from Trader.config, any product with CONSTITUENTS in its product config is a basket
+
+        :param config: (dict) Trader configuration with PRODUCT and STRATEGY
+        :return: (BasketEngine) Basket engine over all configured baskets
+        """
+        config_p, config_s = config['PRODUCT'], config['STRATEGY']
+        baskets = [symbol for symbol, product in config_p.items() if 'CONSTITUENTS' in product]
+        constituents = list(dict.fromkeys(c for b in baskets for c in config_p[b]['CONSTITUENTS']))
+        weights = np.array([[config_p[b]['CONSTITUENTS'].get(c, 0) for c in constituents] for b in baskets],
+                           dtype=float).reshape(len(baskets), len(constituents))
+        return cls(baskets, constituents, weights,
+                   [config_p[b]['POSITION_LIMIT'] for b in baskets],
+                   [config_p[c]['POSITION_LIMIT'] for c in constituents],
+                   config_s)
+
+    def priors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: (Tuple[np.ndarray, np.ndarray]) Configured prior mean and standard deviation of premium of baskets
+        """
+        configs = [self.strategy_config[symbol] for symbol in self.baskets]
+        return (np.array([c['PREMIUM_MEAN'] for c in configs], dtype=float),
+                np.array([c['PREMIUM_STD'] for c in configs], dtype=float))
+
+    def premium_moments(self) -> Dict[Symbol, EWMoments]:
+        """
+        Build online premium estimators of baskets with the current configured mean and standard deviation as priors
+
+        :return: (Dict[Symbol, EWMoments]) Premium moments keyed by basket to store in Trader.data
+        """
+        configs = [self.strategy_config[symbol] for symbol in self.baskets]
+        return {symbol: EWMoments(c['PREMIUM_SPAN'], c['PREMIUM_MEAN'], c['PREMIUM_STD'])
+                for symbol, c in zip(self.baskets, configs)}
+
+    def update(self, state: TradingState):
+        """
+        Calculate NAV and premium of all baskets at the timestamp of the state, and z-score against priors
+        until online moments are scored
+
+        :param state: (TradingState) Trading state of the timestamp
+        """
+        c_mid_vwap = np.array([self.features.book(state, symbol).mid_vwap for symbol in self.constituents])
+        b_mid_vwap = np.array([self.features.book(state, symbol).mid_vwap for symbol in self.baskets])
+        nav = self.weights @ c_mid_vwap
+        premium = b_mid_vwap - nav  # basket - constituent net asset value
+        premium_mean, premium_std = self.priors()
+        self.nav = nav.tolist()
+        self.premium = premium.tolist()
+        self.premium_mean = premium_mean.tolist()
+        self.premium_std = premium_std.tolist()
+        self.z_score = ((premium - premium_mean) / premium_std).tolist()  # against priors
+
+    def score(self, moments: List[EWMoments]):
+        """
+        Update premium mean, standard deviation and z-score of all baskets with online estimates of premium,
+        keeping priors of baskets whose online standard deviation is not positive yet
+
+        :param moments: (List[EWMoments]) Running moments of premium of each basket started from configured priors
+        """
+        prior_mean, prior_std = self.priors()
+        online_mean = np.array([m.mean for m in moments], dtype=float)
+        online_std = np.array([m.stdev() for m in moments], dtype=float)
+        online = online_std > 0  # also false for NaN
+        premium_mean = np.where(online, online_mean, prior_mean)
+        premium_std = np.where(online, online_std, prior_std)
+        self.premium_mean = premium_mean.tolist()
+        self.premium_std = premium_std.tolist()
+        self.z_score = ((np.array(self.premium) - premium_mean) / premium_std).tolist()
+
+
 class BasketTrading:
     """
     Basket trading based on pricing with NAV of constituents\n
@@ -321,26 +1153,18 @@ class BasketTrading:
     Sub-Strategy 2: Market make around fair value\n
     Sub-Strategy 3: Follow trends with constituents which provide smaller spread to take
     """
-    def __init__(self, state: TradingState,
-                 basket_config: dict, constituent_config: Dict[Symbol, dict], strategy_config: dict):
-        # initialize basket and each constituent as Strategy Object
-        self.basket = MarketMaking(state, basket_config, strategy_config)
-        self.constituent = {symbol: Strategy(state, config) for symbol, config in constituent_config.items()}
+    def __init__(self, state: TradingState, basket_config: dict, strategy_config: dict, engine: BasketEngine,
+                 logger: Logger = None):
+        # initialize basket as Strategy Object, constituents are priced together by basket engine
+        self.basket = MarketMaking(state, basket_config, strategy_config, logger)
+        i = engine.index[self.basket.symbol]
 
         # configure basket information
-        self.c_symbols = list(self.constituent.keys())
-        self.c_ratios = {symbol: config['PER_BASKET'] for symbol, config in constituent_config.items()}
-        self.c_limits = {symbol: strategy.position_limit for symbol, strategy in self.constituent.items()}
-        self.c_mid_vwap = {symbol: strategy.mid_vwap for symbol, strategy in self.constituent.items()}
-        self.c_w_bid = {symbol: strategy.worst_bid for symbol, strategy in self.constituent.items()}
-        self.c_w_ask = {symbol: strategy.worst_ask for symbol, strategy in self.constituent.items()}
-        self.c_positions = {symbol: strategy.position for symbol, strategy in self.constituent.items()}
-        self.basket_limit = math.floor(min(self.c_limits[symbol] / self.c_ratios[symbol] for symbol in self.c_symbols))
-        self.basket_limit = min(self.basket_limit, self.basket.position_limit)  # max basket constituent pairs
+        self.basket_limit = engine.basket_limits[i]  # max basket constituent pairs
 
         # strategy configuration
-        self.premium_mean = strategy_config['PREMIUM_MEAN']  # long-term mean premium of basket over constituents
-        self.premium_std = strategy_config['PREMIUM_STD']  # long-term standard deviation of premium
+        self.premium_mean = engine.premium_mean[i]  # online mean premium of basket over constituents
+        self.premium_std = engine.premium_std[i]  # online standard deviation of premium
         self.alpha = strategy_config['LINEAR_SENSITIVITY']  # sensitivity for linear term of z-score
         self.beta = strategy_config['QUADRATIC_SENSITIVITY']  # sensitivity for quadratic term of z-score
         self.sl_target = strategy_config['SL_TARGET']  # stop loss up to sl target position level
@@ -348,10 +1172,10 @@ class BasketTrading:
         self.basket.fair_value = self.basket.mid_vwap  # initialize
         self.basket.position_limit = self.basket_limit  # change to maximum possible
 
-        # build basket features
-        self.basket_nav = sum(self.c_ratios[symbol] * self.c_mid_vwap[symbol] for symbol in self.c_symbols)
-        self.premium = self.basket.mid_vwap - self.basket_nav  # basket - constituent net asset value
-        self.z_score = (self.premium - self.premium_mean) / self.premium_std  # z-score of premium
+        # read basket features updated by engine for all baskets of the timestamp
+        self.basket_nav = engine.nav[i]
+        self.premium = engine.premium[i]  # basket - constituent net asset value
+        self.z_score = engine.z_score[i]  # z-score of premium against online moments
 
     def calculate_fair_value(self):
         """
@@ -373,7 +1197,7 @@ class BasketTrading:
             self.basket.orders.append(Order(self.basket.symbol, order_price, order_quantity))
             self.basket.expected_position += order_quantity
             self.basket.sum_sell_qty += order_quantity
-            print(f"Stop Loss Sell {order_quantity} X @ {order_price}")
+            self.basket.logger.info('SLS', order_quantity, order_price)
 
         elif self.basket.position < -self.basket.sl_inventory:
             # stop buy sell when too much negative inventory, sl up to sl target, max volume worst price
@@ -382,7 +1206,7 @@ class BasketTrading:
             self.basket.orders.append(Order(self.basket.symbol, order_price, order_quantity))
             self.basket.expected_position += order_quantity
             self.basket.sum_buy_qty += order_quantity
-            print(f"Stop Loss Buy {order_quantity} X @ {order_price}")
+            self.basket.logger.info('SLB', order_quantity, order_price)
 
     def aggregate_basket_orders(self) -> List[Order]:
         """
@@ -391,7 +1215,7 @@ class BasketTrading:
         :rtype: List[Order]
         :return: List of orders generated for product
         """
-        print(f"{self.basket.symbol} Position {self.basket.position}")
+        self.basket.logger.info('POS', self.basket.symbol, self.basket.position)
         self.calculate_fair_value()
         self.basket.scratch_under_valued(mid_vwap=True)
         self.aggressive_stop_loss()
@@ -399,6 +1223,252 @@ class BasketTrading:
         return self.basket.orders
 
 
+class Greeks:
+    """
+    Shared kernel of standard normal distribution and Black-Scholes-Merton Greeks for option strategies.\n
+    Scalars use math.erfc, exact to double precision and cheaper than building a NormalDist per timestamp.
+    ArrayGreeks overrides the distribution functions for NumPy arrays. Risk-free rate is assumed to be zero.
+    """
+    SQRT_2 = math.sqrt(2)
+    SQRT_2PI = math.sqrt(2 * math.pi)
+
+    @staticmethod
+    def cdf(x: float) -> float:
+        """
+        Cumulative distribution function of standard normal distribution
+
+        :param x: (float) Input value
+        :return: (float) N(x)
+        """
+        return 0.5 * math.erfc(-x / Greeks.SQRT_2)
+
+    @staticmethod
+    def pdf(x: float) -> float:
+        """
+        Probability density function of standard normal distribution
+
+        :param x: (float) Input value
+        :return: (float) n(x)
+        """
+        return math.exp(-0.5 * x * x) / Greeks.SQRT_2PI
+
+    @staticmethod
+    def hallerbach_volatility(s, c, k, root_tau):
+        """
+        Closed-form implied volatility estimator of calls by Hallerbach (2004), for floats and NumPy arrays
+
+        :return: (float | np.ndarray) Approximate implied volatility, NaN deep in or out of the money
+        """
+        a = 2 * c + k - s
+        b = 1.85 * (s + k) * (k - s) ** 2 / (math.pi * np.sqrt(k * s))
+        with np.errstate(invalid='ignore'):
+            sigma_root_tau = Greeks.SQRT_2PI / (2 * (s + k)) * (a + np.sqrt(a ** 2 - b))
+        return sigma_root_tau / root_tau
+
+    @classmethod
+    def call_price(cls, s, k, d1, sigma_root_tau):
+        """
+        :return: (float | np.ndarray) Call price S * N(d1) - K * N(d2)
+        """
+        return s * cls.cdf(d1) - k * cls.cdf(d1 - sigma_root_tau)
+
+    @classmethod
+    def delta(cls, d1, is_call: bool = True):
+        """
+        :return: (float | np.ndarray) N(d1) for call, N(d1) - 1 for put
+        """
+        return cls.cdf(d1) if is_call else cls.cdf(d1) - 1.0
+
+    @classmethod
+    def gamma(cls, s, d1, sigma_root_tau):
+        """
+        :return: (float | np.ndarray) n(d1) / (S * sigma * sqrt(tau))
+        """
+        return cls.pdf(d1) / (s * sigma_root_tau)
+
+    @classmethod
+    def vega(cls, s, d1, root_tau):
+        """
+        :return: (float | np.ndarray) S * n(d1) * sqrt(tau), per unit of volatility
+        """
+        return s * cls.pdf(d1) * root_tau
+
+
+class ArrayGreeks(Greeks):
+    """
+    Greeks kernel for NumPy arrays.\n
+    NumPy has no erf, so normal cdf uses rational approximation by Abramowitz and Stegun (26.2.17)
+    with absolute error below 7.5e-8.
+    """
+    P = 0.2316419  # coefficients of the rational approximation
+    B = (0.319381530, -0.356563782, 1.781477937, -1.821255978, 1.330274429)
+
+    @staticmethod
+    def cdf(x: np.ndarray) -> np.ndarray:
+        t = 1.0 / (1.0 + ArrayGreeks.P * np.abs(x))
+        b1, b2, b3, b4, b5 = ArrayGreeks.B
+        tail = ArrayGreeks.pdf(x) * t * (b1 + t * (b2 + t * (b3 + t * (b4 + t * b5))))  # Horner scheme
+        return np.where(x >= 0, 1.0 - tail, tail)
+
+    @staticmethod
+    def pdf(x: np.ndarray) -> np.ndarray:
+        return np.exp(-0.5 * x * x) / Greeks.SQRT_2PI
+
+
+class IVSolver:
+    """
+    Exact Black-Scholes-Merton implied volatility of calls by Newton iterations safeguarded with bisection.\n
+    Warm started from the volatility of the previous timestamp, a seed within a tick move of the root converges
+    in 2 iterations and noisy vwap mid-prices take 2 to 3. Solutions are not memoized, as time to maturity changes
+    every timestamp and vwap mid-prices almost never repeat. Risk-free rate is assumed to be zero.
+    """
+    def __init__(self, tolerance: float = 1e-10, max_iterations: int = 100, lower: float = 1e-4, upper: float = 5.0):
+        self.tolerance = tolerance  # convergence tolerance of volatility
+        self.max_iterations = max_iterations
+        self.lower = lower  # bracket of volatility
+        self.upper = upper
+        self.iterations = 0  # iterations of the last solve
+
+    def solve(self, s: float, c: float, k: float, root_tau: float, seed: float = math.nan) -> float:
+        """
+        Solve implied volatility by Newton iterations
+
+        :param s: (float) Price of underlying
+        :param c: (float) Price of call option
+        :param k: (float) Strike price
+        :param root_tau: (float) Square root of time to maturity in years
+        :param seed: (float) Initial guess of volatility, e.g. volatility of the previous timestamp
+        :return: (float) Implied volatility, NaN if price is out of no-arbitrage bounds
+        """
+        self.iterations = 0
+        return self.newton(s, c, k, root_tau, seed)
+
+    def newton(self, s: float, c: float, k: float, root_tau: float, seed: float) -> float:
+        """
+        Newton iterations on call price falling back to bisection whenever a step leaves the bracket
+
+        :return: (float) Implied volatility
+        """
+        if not max(s - k, 0.0) < c < s:
+            return math.nan  # no volatility reproduces price out of no-arbitrage bounds
+        lower, upper = self.lower, self.upper
+        if not lower < seed < upper:  # also catches NaN seed
+            seed = Greeks.SQRT_2PI * c / (s * root_tau)  # Brenner-Subrahmanyam estimate
+            seed = min(max(seed, lower), upper)
+        sigma = seed
+        log_moneyness = math.log(s / k)
+        for iteration in range(1, self.max_iterations + 1):
+            self.iterations = iteration
+            sigma_root_tau = sigma * root_tau
+            d1 = log_moneyness / sigma_root_tau + 0.5 * sigma_root_tau
+            error = Greeks.call_price(s, k, d1, sigma_root_tau) - c
+            if error > 0:  # price increases with volatility
+                upper = sigma
+            else:
+                lower = sigma
+            vega = Greeks.vega(s, d1, root_tau)
+            if vega > 0:
+                step = error / vega
+                if abs(step) < self.tolerance:  # converged before the bracket can reject a step onto its bound
+                    return sigma - step
+                new_sigma = sigma - step
+            else:
+                new_sigma = lower - 1.0
+            if not lower <= new_sigma <= upper:
+                new_sigma = 0.5 * (lower + upper)
+            if abs(new_sigma - sigma) < self.tolerance:
+                return new_sigma
+            sigma = new_sigma
+        return sigma
+
+    def solve_array(self, s: np.ndarray, c: np.ndarray, k: np.ndarray, root_tau: np.ndarray) -> np.ndarray:
+        """
+        Vectorized Newton iterations of newton over broadcast arrays seeded with Hallerbach estimate,
+        iterating until every element converged, so each element matches solve up to the error of ArrayGreeks
+
+        :param s: (np.ndarray) Prices of underlying
+        :param c: (np.ndarray) Prices of call options
+        :param k: (np.ndarray) Strike prices
+        :param root_tau: (np.ndarray) Square roots of time to maturity in years
+        :return: (np.ndarray) Implied volatility, NaN where price is out of no-arbitrage bounds
+        """
+        s, c, k, root_tau = np.broadcast_arrays(s, c, k, root_tau)
+        active = (np.maximum(s - k, 0.0) < c) & (c < s)
+        lower = np.full(s.shape, self.lower)
+        upper = np.full(s.shape, self.upper)
+        sigma = Greeks.hallerbach_volatility(s, c, k, root_tau)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fallback = np.clip(Greeks.SQRT_2PI * c / (s * root_tau), self.lower, self.upper)  # Brenner-Subrahmanyam
+            sigma = np.where((lower < sigma) & (sigma < upper), sigma, fallback)
+            log_moneyness = np.log(s / k)
+            self.iterations = 0
+            for iteration in range(1, self.max_iterations + 1):
+                if not active.any():
+                    break
+                self.iterations = iteration
+                sigma_root_tau = sigma * root_tau
+                d1 = log_moneyness / sigma_root_tau + 0.5 * sigma_root_tau
+                error = ArrayGreeks.call_price(s, k, d1, sigma_root_tau) - c
+                upper = np.where(active & (error > 0), sigma, upper)  # price increases with volatility
+                lower = np.where(active & (error <= 0), sigma, lower)
+                vega = ArrayGreeks.vega(s, d1, root_tau)
+                step = np.where(vega > 0, error / vega, np.inf)
+                stepped = np.abs(step) < self.tolerance  # converged before the bracket can reject the step
+                new_sigma = np.where(vega > 0, sigma - step, lower - 1.0)
+                new_sigma = np.where(stepped | ((lower <= new_sigma) & (new_sigma <= upper)), new_sigma,
+                                     0.5 * (lower + upper))
+                converged = stepped | (np.abs(new_sigma - sigma) < self.tolerance)
+                sigma = np.where(active, new_sigma, sigma)
+                active &= ~converged
+        return np.where((np.maximum(s - k, 0.0) < c) & (c < s), sigma, np.nan)
+
+
+
+class OptionChain:
+    """
+    Vectorized Black-Scholes-Merton features of option chains with NumPy.\n
+    Prices, strikes and time to maturity broadcast against each other, so a chain of strikes at a timestamp
+    or a day of ticks of a single strike is priced in one call. Risk-free rate is assumed to be zero.\n
+    Implied volatility is the exact Newton solution of IVSolver as OptionTrading trades on, so research on chains
+    matches the trader. OptionTrading keeps scalar math for a single strike where NumPy call overhead outweighs
+    vectorization.
+    """
+    solver = IVSolver()  # tolerance and bracket shared with the scalar solver of OptionTrading
+
+    def __init__(self, s: Any, c: Any, k: Any, root_tau: Any, option_type: str = 'CALL'):
+        # price of underlying, price of options, strikes and square root of time to maturity in years
+        # arrays are broadcast by the arithmetic itself, so features take the broadcast shape of all inputs
+        self.s, self.c, self.k, self.root_tau = (np.asarray(x, dtype=float) for x in (s, c, k, root_tau))
+        self.is_call = option_type == 'CALL'  # option type shared by the whole chain
+        self.log_moneyness = np.log(self.s / self.k)
+        self.iv = self.implied_volatility()
+        self.d1, self.d2 = self.calculate_d1_d2(self.iv)
+        self.delta = ArrayGreeks.delta(self.d1, self.is_call)
+        self.gamma = ArrayGreeks.gamma(self.s, self.d1, self.iv * self.root_tau)
+        self.vega = ArrayGreeks.vega(self.s, self.d1, self.root_tau)
+
+    def implied_volatility(self) -> np.ndarray:
+        """
+        Solve exact implied volatility of every option at once with vectorized Newton iterations.\n
+        Put prices are converted to call prices with put-call parity.
+
+        :return: (np.ndarray) Black-Scholes-Merton based implied volatility, NaN out of no-arbitrage bounds
+        """
+        c = self.c if self.is_call else self.c + self.s - self.k
+        return self.solver.solve_array(self.s, c, self.k, self.root_tau)
+
+    def calculate_d1_d2(self, sigma: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate d1, d2 value of Black-Scholes-Merton Model
+
+        :param sigma: (np.ndarray) Volatility input for BSM d1, d2
+        :return: (Tuple[np.ndarray, np.ndarray]) d1, d2 value of BSM
+        """
+        sigma_root_tau = sigma * self.root_tau
+        d1_value = (self.log_moneyness + 0.5 * sigma_root_tau ** 2) / sigma_root_tau
+        return d1_value, d1_value - sigma_root_tau
+
+
 class OptionTrading:
     """
     Trade option with delta neutral strategy mainly exposing to vega
@@ -406,11 +1476,13 @@ class OptionTrading:
     Sub-Strategy 2: Trade IV mean-reversion based on IV z-score, pyramid-style position
     Sub-Strategy 3: Neutralized delta with underlying asset
     """
+    solver = IVSolver()  # implied volatility solver shared by strategies
     def __init__(self, state: TradingState,
-                 underlying_config: dict, option_config: dict, strategy_config: dict):
-        # initialize underlying and option as Strategy Object
-        self.underlying = Strategy(state, underlying_config)
-        self.option = Strategy(state, option_config)
+                 underlying_config: dict, option_config: dict, strategy_config: dict, iv_seed: float = math.nan,
+                 logger: Logger = None):
+        # initialize underlying and option as Strategy Object sharing a logger
+        self.underlying = Strategy(state, underlying_config, logger)
+        self.option = Strategy(state, option_config, self.underlying.logger)
 
         # config option specification
         self.type = strategy_config['TYPE']
@@ -427,27 +1499,34 @@ class OptionTrading:
         # build option features
         self.log_moneyness = math.log(self.underlying.mid_vwap / self.K)
         self.root_tau = math.sqrt((self.T + 1 - self.option.timestamp / 1000000) / self.trading_days)
-        self.iv = self.implied_volatility()
+        self.iv = self.implied_volatility(iv_seed)
         self.d1, self.d2 = self.calculate_d1_d2(self.iv)
-        self.delta = statistics.NormalDist().cdf(self.d1)  # delta = N(d1)
-        self.option_limit = self.underlying.position_limit / self.delta
+        self.delta = Greeks.delta(self.d1)  # delta = N(d1)
+        self.gamma = Greeks.gamma(self.underlying.mid_vwap, self.d1, self.iv * self.root_tau)
+        self.vega = Greeks.vega(self.underlying.mid_vwap, self.d1, self.root_tau)
+        # no option position without a finite positive delta, e.g. NaN IV of a price out of no-arbitrage bounds
+        self.option_limit = self.underlying.position_limit / self.delta if self.delta > 0 else 0.0
         self.iv_zscore = 0.0
 
-    def implied_volatility(self) -> float:
+    def implied_volatility(self, seed: float = math.nan) -> float:
         """
-        Calculate implied volatility using closed-form estimator by Hallerbach (2004).\n
-        Risk-free rate is assumed to be zero.
+        Solve exact implied volatility warm started from seed, or from Hallerbach estimate without seed
 
+        :param seed: (float) Implied volatility of the previous timestamp
         :return: (float) Black-Scholes-Merton based implied volatility
         """
-        s = self.underlying.mid_vwap
-        c = self.option.mid_vwap
-        factor = math.sqrt(2 * math.pi) / (2 * (s + self.K))
-        a = 2 * c + self.K - s
-        b = 1.85 * (s + self.K) * (self.K - s) ** 2 / (math.pi * math.sqrt(self.K * s))
-        sigma_root_tau = factor * (a + math.sqrt(a ** 2 - b))
-        iv = sigma_root_tau / self.root_tau
-        return iv
+        if not math.isfinite(seed):
+            seed = self.hallerbach_volatility()
+        return self.solver.solve(self.underlying.mid_vwap, self.option.mid_vwap, self.K, self.root_tau, seed)
+
+    def hallerbach_volatility(self) -> float:
+        """
+        Calculate implied volatility using closed-form estimator by Hallerbach (2004)
+
+        :return: (float) Approximate implied volatility, NaN deep in or out of the money
+        """
+        return float(Greeks.hallerbach_volatility(self.underlying.mid_vwap, self.option.mid_vwap, self.K,
+                                                  self.root_tau))
 
     def calculate_d1_d2(self, sigma) -> Tuple[float, float]:
         """
@@ -463,16 +1542,14 @@ class OptionTrading:
         d2_value = d1_value - sigma * self.root_tau
         return d1_value, d2_value
 
-    def rolling_iv_z_score(self, data: deque):
+    def rolling_iv_z_score(self, data: Union[RollingMoments, EWMoments]):
         """
         Calculate and update rolling z score of implied volatility
 
-        :param data: (deque) array of implied volatility values
+        :param data: (RollingMoments | EWMoments) Running moments of implied volatility values
         """
         if len(data) >= self.min_window_size:
-            mu = statistics.mean(data)
-            std = statistics.stdev(data)
-            self.iv_zscore = (self.iv - mu) / std
+            self.iv_zscore = (self.iv - data.mean) / data.stdev()
 
     def iv_mean_reversion(self):
         """
@@ -489,7 +1566,7 @@ class OptionTrading:
         if order_quantity != 0 and abs(self.iv_zscore) > self.min_z:
             #  only enter with z-score over signal threshold of min_z
             self.option.orders.append(Order(self.option.symbol, order_price, order_quantity))
-            print(f"IV: {self.iv:.4f} Z-Score {self.iv_zscore:.2f} Take {order_quantity} X @ {order_price}")
+            self.option.logger.info('IV', self.iv, self.iv_zscore, order_quantity, order_price)
             self.option.expected_position += order_quantity
 
     def delta_hedge(self, target_delta: float = 0.0):
@@ -505,7 +1582,7 @@ class OptionTrading:
         order_price = self.underlying.worst_ask if hedge_quantity > 0 else self.underlying.worst_bid
         if hedge_quantity != 0:
             self.underlying.orders.append(Order(self.underlying.symbol, order_price, hedge_quantity))
-            print(f"Delta Hedge {hedge_quantity} X @ {order_price}")
+            self.underlying.logger.info('DH', hedge_quantity, order_price)
 
     def aggregate_option_orders(self) -> List[Order]:
         """
@@ -514,8 +1591,9 @@ class OptionTrading:
         :rtype: List[Order]
         :return: List of orders generated for underlying and option
         """
-        print(f"{self.option.symbol} Current Position {self.option.position}")
-        self.iv_mean_reversion()
+        self.option.logger.info('POS', self.option.symbol, self.option.position)
+        if math.isfinite(self.iv):  # no signal when no volatility reproduces the option price
+            self.iv_mean_reversion()
         return self.option.orders
 
     def aggregate_underlying_orders(self) -> List[Order]:
@@ -525,12 +1603,114 @@ class OptionTrading:
         :rtype: List[Order]
         :return: List of orders generated for underlying
         """
-        print(f"{self.underlying.symbol} Current Position {self.underlying.position}")
+        self.underlying.logger.info('POS', self.underlying.symbol, self.underlying.position)
         # use volatility reversion as a signal to trade underlying same direction
-        self.delta_hedge(target_delta=2 * self.delta * self.option.expected_position)
+        if math.isfinite(self.iv):  # delta is undefined without implied volatility
+            self.delta_hedge(target_delta=2 * self.delta * self.option.expected_position)
         return self.underlying.orders
 
 
+class StrategyRegistry:
+    """
+    Declarative registry of strategy blocks of Trader.run with the inputs, dependencies and priority of each block.\n
+    Scheduler runs blocks in dependency order, higher priority first, skips blocks whose symbols or conversion
+    observations are missing at the timestamp or whose dependencies did not run, and measures elapsed time of
+    every block.\n
+    Blocks are shed under a per-timestamp time budget: a block whose estimated time would overrun the budget
+    counted from the start of Trader.run is not run, together with the blocks depending on it,
+    so the lowest priority strategies are dropped first when a timestamp runs late.
+    """
+    def __init__(self, budget_ms: float = 300.0, cost_span: int = 20):
+        # name: (block, required symbols, required conversion observations, names of blocks to run before, priority)
+        self.blocks: Dict[str, Tuple[Callable, Tuple[Symbol, ...], Tuple[Product, ...], Tuple[str, ...], int]] = {}
+        self.schedule: List[str] = []  # names of blocks in dependency and priority order, sorted lazily
+        self.timings: Dict[str, int] = {}  # elapsed nanoseconds of each block run at the last timestamp
+        self.skipped: List[str] = []  # blocks skipped for missing inputs at the last timestamp
+        self.budget = int(budget_ms * 1e6)  # nanoseconds of Trader.run left to blocks, the rest is for encoding
+        self.cost_alpha = 2 / (cost_span + 1)  # smoothing of estimated block time
+        self.costs: Dict[str, float] = {}  # exponentially weighted elapsed nanoseconds of each block
+        self.shed: List[str] = []  # blocks shed over budget at the last timestamp
+        self.shed_counts: Dict[str, int] = {}  # blocks shed over budget since the instance started
+
+    def register(self, name: str, symbols: List[Symbol], observations: List[Product] = (), after: List[str] = (),
+                 priority: int = 0):
+        """
+        Decorator registering a Trader method as strategy block.\n
+        Block is called as block(trader, state, result), adds orders to result and returns conversions if any.
+
+        :param name: (str) Unique name of the block
+        :param symbols: (List[Symbol]) Symbols whose order depths the block reads
+        :param observations: (List[Product]) Products whose conversion observations the block reads
+        :param after: (List[str]) Names of blocks which must run before this block
+        :param priority: (int) Blocks of higher priority run first and are shed last
+        """
+        def decorator(block: Callable) -> Callable:
+            self.blocks[name] = (block, tuple(symbols), tuple(observations), tuple(after), priority)
+            self.schedule = []
+            return block
+        return decorator
+
+    def sort(self) -> List[str]:
+        """
+        Order blocks so that every block runs after its dependencies, otherwise by priority and registration order
+
+        :return: (List[str]) Names of blocks in dependency and priority order
+        """
+        ordered: List[str] = []
+        pending = list(self.blocks)
+        while pending:
+            ready = [name for name in pending if all(dependency in ordered for dependency in self.blocks[name][3])]
+            if not ready:
+                raise ValueError(f"Circular or missing dependency of strategy blocks {pending}")
+            name = max(ready, key=lambda n: self.blocks[n][4])  # first registered among equal priority
+            ordered.append(name)
+            pending.remove(name)
+        return ordered
+
+    def run(self, trader: Any, state: TradingState, result: Dict[Symbol, List[Order]], start: int = None) -> int:
+        """
+        Run every block whose inputs are present at the timestamp in dependency order, shedding blocks over budget
+
+        :param trader: (Trader) Trader passed to the blocks
+        :param state: (TradingState) Trading state of the timestamp
+        :param result: (Dict[Symbol, List[Order]]) Orders of the timestamp filled by the blocks
+        :param start: (int) time.perf_counter_ns at the start of Trader.run, default now
+        :return: (int) Total conversions requested by the blocks
+        """
+        if not self.schedule:
+            self.schedule = self.sort()
+        if start is None:
+            start = time.perf_counter_ns()
+        order_depths = state.order_depths
+        conversion_observations = state.observations.conversionObservations
+        self.timings = {}
+        self.skipped = []
+        self.shed = []
+        conversions = 0
+        for name in self.schedule:
+            block, symbols, observations, after, _ = self.blocks[name]
+            if (any(symbol not in order_depths for symbol in symbols)
+                    or any(product not in conversion_observations for product in observations)
+                    or any(dependency not in self.timings and dependency not in self.shed for dependency in after)):
+                self.skipped.append(name)
+                continue
+            block_start = time.perf_counter_ns()
+            if (any(dependency in self.shed for dependency in after)
+                    or block_start - start + self.costs.get(name, 0.0) > self.budget):
+                self.shed.append(name)
+                self.shed_counts[name] = self.shed_counts.get(name, 0) + 1
+                trader.logger.info('SHED', name, (block_start - start) / 1e6, self.costs.get(name, 0.0) / 1e6)
+                if name in self.costs:  # decay the estimate so a block shed after a single slow run is retried
+                    self.costs[name] *= 1 - self.cost_alpha
+                continue
+            conversions += block(trader, state, result) or 0
+            elapsed = time.perf_counter_ns() - block_start
+            self.timings[name] = elapsed
+            cost = self.costs.get(name)
+            self.costs[name] = elapsed if cost is None else cost + self.cost_alpha * (elapsed - cost)
+        return conversions
+
+
 class Trader:
     """
     Class containing data and sending and receiving data with the trading server
@@ -540,8 +1720,13 @@ class Trader:
                'GIFT_BASKET', 'CHOCOLATE', 'STRAWBERRIES', 'ROSES',  # Round 3
                'COCONUT', 'COCONUT_COUPON']  # Round 4
 
-    data = {"STARFRUIT": deque(),
-            "COCONUT": deque()}
+    # replace RollingMoments with EWMoments(span) for exponentially weighted IV z-score
+    data = {"STARFRUIT": RollingRegression(),
+            "COCONUT": RollingMoments()}
+
+    codec: StateCodec = BinaryCodec()  # serializer of data into traderData, falls back to jsonpickle
+    persistence = DeltaPersistence(codec)  # set snapshot interval 1 for a full snapshot every timestamp
+    logger = Logger()  # passed to strategies, assign a Logger to an instance to give the trader its own logs
 
     config = {'PRODUCT': {'AMETHYSTS': {'SYMBOL': 'AMETHYSTS',
                                         'PRODUCT': 'AMETHYSTS',
@@ -555,19 +1740,17 @@ class Trader:
                                       'COST_STORING': 0.1},
                           'GIFT_BASKET': {'SYMBOL': 'GIFT_BASKET',
                                           'PRODUCT': 'GIFT_BASKET',
-                                          'POSITION_LIMIT': 60},
+                                          'POSITION_LIMIT': 60,
+                                          'CONSTITUENTS': {'CHOCOLATE': 4, 'STRAWBERRIES': 6, 'ROSES': 1}},
                           'CHOCOLATE': {'SYMBOL': 'CHOCOLATE',
                                         'PRODUCT': 'CHOCOLATE',
-                                        'POSITION_LIMIT': 250,
-                                        'PER_BASKET': 4},
+                                        'POSITION_LIMIT': 250},
                           'STRAWBERRIES': {'SYMBOL': 'STRAWBERRIES',
                                            'PRODUCT': 'STRAWBERRIES',
-                                           'POSITION_LIMIT': 350,
-                                           'PER_BASKET': 6},
+                                           'POSITION_LIMIT': 350},
                           'ROSES': {'SYMBOL': 'ROSES',
                                     'PRODUCT': 'ROSES',
-                                    'POSITION_LIMIT': 60,
-                                    'PER_BASKET': 1},
+                                    'POSITION_LIMIT': 60},
                           'COCONUT': {'SYMBOL': 'COCONUT',
                                       'PRODUCT': 'COCONUT',
                                       'POSITION_LIMIT': 300},
@@ -592,8 +1775,9 @@ class Trader:
                            'ORCHIDS': {'EXP_STORAGE_TIME': 1,
                                        'MIN_EDGE': 1.0,
                                        'MM_EDGE': 1.5},
-                           'GIFT_BASKET': {'PREMIUM_MEAN': 385.0,
+                           'GIFT_BASKET': {'PREMIUM_MEAN': 385.0,  # prior of online premium estimate
                                            'PREMIUM_STD': 75.0,
+                                           'PREMIUM_SPAN': 2000,
                                            'FAIR_VALUE': 70000.0,
                                            'SL_INVENTORY': 57,
                                            'SL_SPREAD': 1,
@@ -614,6 +1798,16 @@ class Trader:
                            }
               }
 
+    # weight matrix of all baskets over their constituents, built once from product config
+    baskets = BasketEngine.from_config(config)
+    # online premium estimate of each basket in data, starting from configured mean and std as priors,
+    # rebuilt by configure when the strategy config changes
+    data.update(baskets.premium_moments())
+
+    # strategy blocks of run declared with their symbols, dependencies and priority by decorators below,
+    # blocks are shed from the lowest priority once 300 ms of the 900 ms limit of the platform are spent
+    registry = StrategyRegistry(budget_ms=300.0)
+
     trader_config = {"STARFRUIT": {"Valentina": (0.3393, 0.18),
                                    "Remy": (-2.1116, 0.40),
                                    "Vladimir": (0.6203, 0.17),
@@ -632,29 +1826,35 @@ class Trader:
                                    "Adam": (-0.2603, 0.22)}
                      }
 
+    @classmethod
+    def configure(cls):
+        """
+        Rebuild state derived from the strategy config at class definition after the config is changed,
+        e.g. by parameter overrides of a backtest, so that priors of data follow the config
+        """
+        cls.data.update(cls.baskets.premium_moments())
+
     def restore_data(self, timestamp, encoded_data):
         """
-        Restore data by decoding traderData with jsonpickle if loss in data is found
+        Restore data from traderData if data in memory is behind, e.g. after cold start of instance
 
         :param timestamp: (int) current timestamp
-        :param encoded_data: (str) traderData from previous timestamp encoded with jsonpickle
+        :param encoded_data: (str) traderData from previous timestamp encoded with persistence
         """
-        data_loss = any([bool(v) for v in self.data.values()])
-        # restore only if any empty data except 0 timestamp
-        if timestamp >= 100 and data_loss:
-            self.data = jsonpickle.decode(encoded_data, keys=True)
+        # nothing to restore at 0 timestamp, data is restored in place to keep class variable in sync
+        if timestamp >= 100:
+            self.persistence.restore(encoded_data, self.data)
 
-    def store_data(self, symbol: Symbol, value: Any, max_size: int = None):
+    def store_data(self, symbol: Symbol, value: Any, max_size: int = None, x: int = None):
         """
-        Store new mid vwap data for Starfruit to class variable as queue
+        Store new data to class variable as queue, running statistics of the queue update on append and pop
         :param symbol: (Symbol) Symbol of which data belongs to
         :param value: (Any) Value to be stored in data
         :param max_size: (int) Maximum size of the array, default None
+        :param x: (int) Tick of the value for data regressed over time, default None
         """
-        if max_size:
-            while len(self.data[symbol]) >= max_size:
-                self.data[symbol].popleft()
-        self.data[symbol].append(value)
+        self.persistence.push(self.data[symbol], value, max_size, x)
+        self.persistence.record(symbol, value, max_size, x)
 
     def trader_signal(self, state: TradingState, product: Product) -> float:
         """
@@ -690,66 +1890,98 @@ class Trader:
             signal = sum(temp) / len(temp) if temp else 0.0
         return signal * self.config["STRATEGY"][product]["SIGNAL_SCALE"]
 
-    def run(self, state: TradingState) -> Tuple[Dict[Symbol, List[Order]], int, str]:
+    # Round 1: AMETHYSTS and STARFRUIT (Market Making)
+    # Round 5: De-anonymized trade data (Only apply to Round 1 products)
+    @registry.register('AMETHYSTS', symbols=['AMETHYSTS'], priority=5)
+    def fixed_market_making(self, state: TradingState, result: Dict[Symbol, List[Order]]):
         """
-        Trading algorithm that will be iterated for every timestamp
-
-        :param state: (TradingState) State of each timestamp
-        :return: result, conversions, traderData: (Tuple[[Dict[Symbol, List[Order]], int, str])
-        Results (dict of orders, conversion number, and data) of algorithms to send to the server
+        Fixed fair value market making of AMETHYSTS
         """
-        # restore data from traderData of last timestamp
-        self.restore_data(state.timestamp, state.traderData)
-
-        config_p = self.config['PRODUCT']
-        config_s = self.config['STRATEGY']
-
-        # aggregate orders in this result dictionary
-        result: Dict[Symbol, List[Order]] = {}
-        conversions: int = 0
-
-        # Round 1: AMETHYSTS and STARFRUIT (Market Making)
-        # Round 5: De-anonymized trade data (Only apply to Round 1 products)
-        # Symbol 0: AMETHYSTS (Fixed Fair Value Market Making)
-        symbol = self.symbols[0]
-        fixed_mm = MarketMaking(state, config_p[symbol], config_s[symbol])
+        symbol = 'AMETHYSTS'
+        fixed_mm = MarketMaking(state, self.config['PRODUCT'][symbol], self.config['STRATEGY'][symbol], self.logger)
         fixed_mm.fair_value += self.trader_signal(state, symbol)  # round 5 trader signal
         result[symbol] = fixed_mm.aggregate_orders()
 
-        # Symbol 1: STARFRUIT (Linear Regression Market Making)
-        symbol = self.symbols[1]
-        lr_mm = LinearRegressionMM(state, config_p[symbol], config_s[symbol])
-        self.store_data(lr_mm.symbol, lr_mm.mid_vwap, lr_mm.max_window_size)  # update data
+    @registry.register('STARFRUIT', symbols=['STARFRUIT'], priority=4)
+    def linear_regression_market_making(self, state: TradingState, result: Dict[Symbol, List[Order]]):
+        """
+        Linear regression market making of STARFRUIT
+        """
+        symbol = 'STARFRUIT'
+        lr_mm = LinearRegressionMM(state, self.config['PRODUCT'][symbol], self.config['STRATEGY'][symbol],
+                                   self.logger)
+        self.store_data(lr_mm.symbol, lr_mm.mid_vwap, lr_mm.max_window_size, state.timestamp // 100)  # update data
         lr_mm.predict_price(self.data[symbol])  # update fair value
         lr_mm.fair_value += self.trader_signal(state, symbol)  # round 5 trader signal
         result[symbol] = lr_mm.aggregate_orders()
 
-        # Round 2: OTC-Exchange Arbitrage
-        # Symbol 2: ORCHIDS
-        symbol = self.symbols[2]
-        otc_arb = OTCArbitrage(state, config_p[symbol], config_s[symbol])
+    # Round 2: OTC-Exchange Arbitrage
+    @registry.register('ORCHIDS', symbols=['ORCHIDS'], observations=['ORCHIDS'], priority=3)
+    def otc_arbitrage(self, state: TradingState, result: Dict[Symbol, List[Order]]) -> int:
+        """
+        OTC-Exchange arbitrage of ORCHIDS
+
+        :return: (int) Conversions to exit arbitrage position
+        """
+        symbol = 'ORCHIDS'
+        otc_arb = OTCArbitrage(state, self.config['PRODUCT'][symbol], self.config['STRATEGY'][symbol], self.logger)
         result[symbol], conversions = otc_arb.aggregate_orders_conversions()
+        return conversions
 
-        # Round 3: Basket Trading
-        # Symbol 3: GIFT_BASKET, 4 ~ 6: CHOCOLATE, STRAWBERRIES, ROSES
-        symbol_basket = self.symbols[3]
-        symbols_constituent = [self.symbols[i] for i in range(4, 7)]
-        basket_trading = BasketTrading(state, config_p[symbol_basket],
-                                       {s: config_p[s] for s in symbols_constituent}, config_s[symbol_basket])
-        result[symbol_basket] = basket_trading.aggregate_basket_orders()
-
-        # Round 4: Option Trading
-        # Symbol 7: COCONUT, 8: COCONUT_COUPON
-        symbol_underlying = self.symbols[7]
-        symbol_option = self.symbols[8]
-        option_trading = OptionTrading(state, config_p[symbol_underlying],
-                                       config_p[symbol_option], config_s[symbol_underlying])
+    # Round 3: Basket Trading
+    @registry.register('BASKET_NAV', symbols=baskets.baskets + baskets.constituents, priority=2)
+    def basket_nav(self, state: TradingState, result: Dict[Symbol, List[Order]]):
+        """
+        NAV, premium and z-score of all baskets at once, scored against online premium moments in data
+        """
+        self.baskets.update(state)
+        for symbol, premium in zip(self.baskets.baskets, self.baskets.premium):
+            self.store_data(symbol, premium)  # update data
+        self.baskets.score([self.data[symbol] for symbol in self.baskets.baskets])  # update z score
+
+    @registry.register('BASKETS', symbols=baskets.baskets, after=['BASKET_NAV'], priority=2)
+    def basket_trading(self, state: TradingState, result: Dict[Symbol, List[Order]]):
+        """
+        Market making of each basket priced with constituent NAV
+        """
+        for symbol in self.baskets.baskets:
+            basket_trading = BasketTrading(state, self.config['PRODUCT'][symbol], self.config['STRATEGY'][symbol],
+                                           self.baskets, self.logger)
+            result[symbol] = basket_trading.aggregate_basket_orders()
+
+    # Round 4: Option Trading
+    @registry.register('COCONUT', symbols=['COCONUT', 'COCONUT_COUPON'], priority=1)
+    def option_trading(self, state: TradingState, result: Dict[Symbol, List[Order]]):
+        """
+        IV mean reversion of COCONUT_COUPON with delta hedge in COCONUT
+        """
+        symbol_underlying, symbol_option = 'COCONUT', 'COCONUT_COUPON'
+        config_p = self.config['PRODUCT']
+        option_trading = OptionTrading(state, config_p[symbol_underlying], config_p[symbol_option],
+                                       self.config['STRATEGY'][symbol_underlying], self.data[symbol_underlying].last(),
+                                       self.logger)
         self.store_data(symbol_underlying, option_trading.iv, option_trading.max_window_size)  # update data
         option_trading.rolling_iv_z_score(self.data[symbol_underlying])  # update z score
         result[symbol_option] = option_trading.aggregate_option_orders()  # trade option with iv mean reversion
         result[symbol_underlying] = option_trading.aggregate_underlying_orders()  # trade with same direction
 
+    def run(self, state: TradingState) -> Tuple[Dict[Symbol, List[Order]], int, str]:
+        """
+        Trading algorithm that will be iterated for every timestamp
+
+        :param state: (TradingState) State of each timestamp
+        :return: result, conversions, traderData: (Tuple[[Dict[Symbol, List[Order]], int, str])
+        Results (dict of orders, conversion number, and data) of algorithms to send to the server
+        """
+        start = time.perf_counter_ns()  # time budget of strategy blocks counts from here
+        # restore data from traderData of last timestamp
+        self.restore_data(state.timestamp, state.traderData)
+
+        # aggregate orders in this result dictionary
+        result: Dict[Symbol, List[Order]] = {}
+        conversions = self.registry.run(self, state, result, start)  # run strategies whose books are present
+
         # Save Data to traderData and pass to next timestamp
-        traderData = jsonpickle.encode(self.data, keys=True)
-        # logger.flush(state, result, conversions, traderData)
+        traderData = self.persistence.encode(self.data)
+        self.logger.flush(state, result, conversions, traderData)
         return result, conversions, traderData
@@ -0,0 +1,80 @@
+import copy
+import math
+import os
+import random
+import sys
+from collections import deque
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from round_5 import BinaryCodec, JsonPickleCodec, Trader
+
+CODECS = [BinaryCodec(), JsonPickleCodec()]
+
+
+def populated_data():
+    """
+    Copy of Trader.data with every series filled as after a few hundred timestamps, including NaN IV
+    """
+    rng = random.Random(0)
+    data = copy.deepcopy(Trader.data)
+    for t in range(300):
+        if t % 7 != 3:  # STARFRUIT skipped on some ticks
+            if len(data['STARFRUIT']) >= 10:
+                data['STARFRUIT'].popleft()
+            data['STARFRUIT'].append(5000 + rng.gauss(0, 2), t)
+        if len(data['COCONUT']) >= 200:
+            data['COCONUT'].popleft()
+        data['COCONUT'].append(math.nan if t % 50 == 0 else 0.16 + rng.gauss(0, 0.01))
+        for symbol in Trader.baskets.baskets:
+            data[symbol].append(380 + rng.gauss(0, 60))
+    data['SPREAD'] = deque(rng.random() for _ in range(20))
+    return data
+
+
+def normalize(value):
+    """
+    Comparable form of a series with NaN replaced, as NaN never equals itself
+    """
+    if isinstance(value, float):
+        return 'nan' if math.isnan(value) else value
+    if isinstance(value, deque):
+        return [normalize(v) for v in value]
+    if hasattr(value, '__dict__'):
+        return type(value).__name__, {key: normalize(v) for key, v in vars(value).items()}
+    return value
+
+
+@pytest.mark.parametrize('codec', CODECS, ids=lambda codec: type(codec).__name__)
+def test_round_trip_of_populated_data(codec):
+    data = populated_data()
+    decoded = codec.decode(codec.encode(data))
+    assert list(decoded) == list(data)
+    assert {key: normalize(value) for key, value in decoded.items()} == \
+           {key: normalize(value) for key, value in data.items()}
+    assert decoded['STARFRUIT'].predict(1) == data['STARFRUIT'].predict(1)
+    assert type(decoded['STARFRUIT'].sum_x) is int  # integer sums stay exact after decode
+
+
+def test_binary_codec_writes_binary_payload():
+    assert BinaryCodec().encode(populated_data()).startswith(BinaryCodec.PREFIX)
+
+
+def test_binary_codec_falls_back_to_jsonpickle_for_unsupported_data():
+    data = populated_data()
+    data['NOTES'] = {'last_signal': 'Remy', 'count': 3}
+    codec = BinaryCodec()
+    encoded = codec.encode(data)
+    assert not encoded.startswith(BinaryCodec.PREFIX)
+    decoded = codec.decode(encoded)
+    assert decoded['NOTES'] == data['NOTES']
+    assert normalize(decoded['COCONUT']) == normalize(data['COCONUT'])
+
+
+def test_binary_codec_rejects_unknown_version():
+    payload = bytearray(BinaryCodec().pack(populated_data()))
+    payload[0] = BinaryCodec.VERSION + 1
+    with pytest.raises(ValueError):
+        BinaryCodec().unpack(bytes(payload))
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.data import BookSnapshot
+from backtester.engine import SUBMISSION, Backtester
+from backtester.models import Order
+from backtester.stream import Tick
+
+BOOK = BookSnapshot(((99, 5), (98, 5), (96, 5)), ((101, -5), (102, -5), (104, -5)), 100.0)
+
+
+class ScriptedTrader:
+    """
+    Trader submitting the orders scripted for each timestamp
+    """
+    def __init__(self, script):
+        self.script = script  # timestamp to list of (price, quantity) of AMETHYSTS
+        self.positions = []  # position shown in each state
+
+    def run(self, state):
+        self.positions.append(state.position.get('AMETHYSTS', 0))
+        orders = [Order('AMETHYSTS', price, quantity) for price, quantity in self.script.get(state.timestamp, [])]
+        return {'AMETHYSTS': orders}, 0, ''
+
+
+def ticks(count):
+    return [Tick(100 * t, {'AMETHYSTS': BOOK}, {}, {}) for t in range(count)]
+
+
+def test_buy_crosses_asks_from_best_level():
+    position, cash, resting = {}, {'AMETHYSTS': 0.0}, []
+    trades = Backtester.match_orders(0, [Order('AMETHYSTS', 103, 12)], BOOK, position, cash, resting)
+    assert [(t.price, t.quantity, t.buyer) for t in trades] == [(101, 5, SUBMISSION), (102, 5, SUBMISSION)]
+    assert position == {'AMETHYSTS': 10}
+    assert cash['AMETHYSTS'] == -(101 * 5 + 102 * 5)
+    assert resting == [[103, 2]]  # the rest of the order rests at its price
+
+
+def test_sell_crosses_bids_and_orders_share_liquidity():
+    position, cash = {}, {'AMETHYSTS': 0.0}
+    orders = [Order('AMETHYSTS', 98, -7), Order('AMETHYSTS', 98, -7)]
+    trades = Backtester.match_orders(0, orders, BOOK, position, cash)
+    assert [(t.price, t.quantity, t.seller) for t in trades] == [(99, 5, SUBMISSION), (98, 2, SUBMISSION),
+                                                                  (98, 3, SUBMISSION)]
+    assert position == {'AMETHYSTS': -10}
+    assert cash['AMETHYSTS'] == 99 * 5 + 98 * 5
+
+
+def test_order_not_crossing_does_not_trade():
+    position, cash = {}, {'AMETHYSTS': 0.0}
+    assert Backtester.match_orders(0, [Order('AMETHYSTS', 100, 3), Order('AMETHYSTS', 100, -3)], BOOK,
+                                   position, cash) == []
+    assert position == {}
+
+
+@pytest.mark.parametrize('position, quantities, accepted', [(18, [2], True),
+                                                             (18, [3], False),
+                                                             (18, [2, -38], True),
+                                                             (18, [2, -39], False),
+                                                             (-20, [1, 1], True)])
+def test_within_limit_checks_each_side_of_the_order_set(position, quantities, accepted):
+    orders = [Order('AMETHYSTS', 100, quantity) for quantity in quantities]
+    assert Backtester(lambda: None, limits={'AMETHYSTS': 20}).within_limit('AMETHYSTS', orders, position) == accepted
+
+
+def test_order_set_breaching_limit_is_rejected_as_a_whole():
+    trader = ScriptedTrader({0: [(101, 5)], 100: [(104, 16), (95, -1)], 200: [(104, 15)]})
+    result = Backtester(lambda: trader, limits={'AMETHYSTS': 20}).run_stream([(0, ticks(4))])
+    assert trader.positions == [0, 5, 5, 20]  # the set at 100 could reach 21 so neither order filled
+    assert result.rejected == {0: {'AMETHYSTS': 1}}
+    assert result.own_trades == 1 + 3
+
+
+def test_rejected_order_sets_are_counted_per_day():
+    def factory():
+        return ScriptedTrader({100: [(101, 30)], 200: [(101, 30)]})
+
+    result = Backtester(factory, limits={'AMETHYSTS': 20}).run_stream([(0, ticks(3)), (1, ticks(2)), (2, ticks(1))])
+    assert result.rejected == {0: {'AMETHYSTS': 2}, 1: {'AMETHYSTS': 1}, 2: {}}
+    lines = result.summary().splitlines()
+    assert lines[lines.index('Day 0') + 1].endswith('(2 rejected)')
+    assert lines[lines.index('Day 1') + 1].endswith('(1 rejected)')
+    assert 'rejected' not in lines[lines.index('Day 2') + 1]
+
+
+def test_position_is_marked_to_the_last_mid():
+    trader = ScriptedTrader({0: [(101, 5)]})
+    result = Backtester(lambda: trader).run_stream([(0, ticks(2))])
+    assert result.day_pnl == {0: {'AMETHYSTS': 5 * (100.0 - 101)}}
@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.data import BookSnapshot
+from backtester.engine import SUBMISSION
+from backtester.fills import QueueFillModel
+from backtester.models import Trade
+
+BOOK = BookSnapshot(((99, 10),), ((103, -10),), 101.0)
+
+
+def fill(resting, tape, book=BOOK, queue_fraction=1.0):
+    position, cash = {}, {'STARFRUIT': 0.0}
+    trades = QueueFillModel(queue_fraction).fill(100, 'STARFRUIT', resting, book, tape, position, cash)
+    return [(t.price, t.quantity, t.buyer, t.seller) for t in trades], position.get('STARFRUIT', 0), cash['STARFRUIT']
+
+
+def test_trade_at_mid_fills_both_sides_from_its_size_once():
+    trades, position, _ = fill([[102, 5], [100, -5]], [Trade('STARFRUIT', 101, 5, 'Remy', 'Vinnie')])
+    assert trades == [(102, 5, SUBMISSION, 'Vinnie')]
+    assert position == 5
+
+
+def test_trade_at_mid_splits_its_size_across_sides():
+    trades, position, _ = fill([[102, 3], [100, -5]], [Trade('STARFRUIT', 101, 5, 'Remy', 'Vinnie')])
+    assert trades == [(102, 3, SUBMISSION, 'Vinnie'), (100, 2, 'Remy', SUBMISSION)]
+    assert position == 1
+
+
+def test_trade_above_mid_only_fills_asks():
+    trades, position, cash = fill([[102, 5], [100, -5]], [Trade('STARFRUIT', 102, 4, 'Remy', 'Vinnie')])
+    assert trades == [(100, 4, 'Remy', SUBMISSION)]
+    assert position == -4
+    assert cash == 400.0
+
+
+def test_trade_below_mid_only_fills_bids():
+    trades, position, _ = fill([[101, 5], [102, -5]], [Trade('STARFRUIT', 100, 7, 'Remy', 'Vinnie')])
+    assert trades == [(101, 5, SUBMISSION, 'Vinnie')]
+    assert position == 5
+
+
+def test_quote_at_trade_price_waits_behind_visible_queue():
+    tape = [Trade('STARFRUIT', 99, 12, 'Remy', 'Vinnie')]
+    assert fill([[99, 5]], tape)[0] == [(99, 2, SUBMISSION, 'Vinnie')]
+    assert fill([[99, 5]], tape, queue_fraction=0.5)[0] == [(99, 5, SUBMISSION, 'Vinnie')]
+
+
+def test_better_quote_fills_first():
+    trades, _, _ = fill([[100, 3], [99, 3]], [Trade('STARFRUIT', 99, 4, 'Remy', 'Vinnie')])
+    assert trades == [(100, 3, SUBMISSION, 'Vinnie')]  # the rest of the trade is queued ahead of the 99 quote
+
+
+def test_one_sided_book_shares_trade_size():
+    book = BookSnapshot(((99, 10),), (), 99.0)
+    trades, position, _ = fill([[102, 5], [100, -5]], [Trade('STARFRUIT', 101, 5, 'Remy', 'Vinnie')], book)
+    assert sum(quantity for _, quantity, _, _ in trades) == 5
+    assert position == 5
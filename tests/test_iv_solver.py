@@ -0,0 +1,59 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from round_5 import Greeks, IVSolver
+
+ROOT_TAU = math.sqrt(246 / 250)
+SIGMA = 0.16
+
+
+def call_price(s, k, root_tau, sigma):
+    sigma_root_tau = sigma * root_tau
+    d1 = math.log(s / k) / sigma_root_tau + 0.5 * sigma_root_tau
+    return Greeks.call_price(s, k, d1, sigma_root_tau)
+
+
+@pytest.mark.parametrize('k', [9500.0, 10000.0, 10500.0])
+@pytest.mark.parametrize('offset', [1e-4, -1e-4, 1e-5, 0.0])
+def test_close_seed_converges_in_two_iterations(k, offset):
+    solver = IVSolver()
+    sigma = solver.solve(10000.0, call_price(10000.0, k, ROOT_TAU, SIGMA), k, ROOT_TAU, SIGMA * (1 + offset))
+    assert sigma == pytest.approx(SIGMA, abs=1e-12)
+    assert solver.iterations <= 2
+
+
+@pytest.mark.parametrize('k', [9500.0, 10000.0, 10500.0])
+@pytest.mark.parametrize('offset', [0.01, -0.01])
+def test_seed_off_by_one_percent_is_not_bisected_away(k, offset):
+    solver = IVSolver()
+    sigma = solver.solve(10000.0, call_price(10000.0, k, ROOT_TAU, SIGMA), k, ROOT_TAU, SIGMA * (1 + offset))
+    assert sigma == pytest.approx(SIGMA, abs=1e-12)
+    assert solver.iterations <= 3
+
+
+@pytest.mark.parametrize('c', [0.0, 10000.0, 200.0])
+def test_price_out_of_bounds_is_nan(c):
+    assert math.isnan(IVSolver().solve(10000.0, c, 9500.0, ROOT_TAU, SIGMA))
+
+
+def test_missing_seed_falls_back_to_estimate():
+    solver = IVSolver()
+    sigma = solver.solve(10000.0, call_price(10000.0, 10000.0, ROOT_TAU, SIGMA), 10000.0, ROOT_TAU)
+    assert sigma == pytest.approx(SIGMA, abs=1e-12)
+
+
+def test_array_solve_matches_scalar_solve_at_exact_roots():
+    s = np.full(5, 10000.0)
+    k = np.array([9000.0, 9500.0, 10000.0, 10500.0, 11000.0])
+    c = np.array([call_price(10000.0, strike, ROOT_TAU, SIGMA) for strike in k])
+    solver = IVSolver()
+    sigma = solver.solve_array(s, c, k, ROOT_TAU)
+    assert sigma == pytest.approx(np.full(5, SIGMA), abs=1e-6)  # error of the polynomial normal cdf
+    assert solver.iterations <= 4
+    assert math.isnan(solver.solve_array(10000.0, 0.0, 10000.0, ROOT_TAU)[()])
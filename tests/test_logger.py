@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datamodel import *
+from round_5 import Logger, MarketMaking, Trader
+
+
+def amethysts_state(timestamp=100, position=3):
+    order_depth = OrderDepth()
+    order_depth.buy_orders = {9996: 10, 9995: 20}
+    order_depth.sell_orders = {10004: -10, 10005: -20}
+    return TradingState('', timestamp, {'AMETHYSTS': Listing('AMETHYSTS', 'AMETHYSTS', 'SEASHELLS')},
+                        {'AMETHYSTS': order_depth}, {}, {}, {'AMETHYSTS': position}, Observation({}, {}))
+
+
+def test_strategies_log_to_the_logger_of_their_trader(capsys):
+    first, second = Trader(), Trader()
+    first.logger = Logger(state_output=False)
+    second.logger = Logger(state_output=False, level=Logger.OFF)
+    first.run(amethysts_state())
+    second.run(amethysts_state(200))
+    lines = capsys.readouterr().out.splitlines()
+    assert 'POS AMETHYSTS 3' in lines  # position lines are logged at the default level
+    assert len([line for line in lines if line.startswith('POS AMETHYSTS')]) == 1  # second trader is silent
+
+
+def test_strategy_without_logger_keeps_its_own_buffer():
+    config = Trader.config
+    market_making = MarketMaking(amethysts_state(), config['PRODUCT']['AMETHYSTS'], config['STRATEGY']['AMETHYSTS'])
+    market_making.aggregate_orders()
+    assert market_making.logger is not Trader.logger
+    assert any(message.startswith('POS AMETHYSTS') for message in market_making.logger.buffer)
@@ -0,0 +1,96 @@
+import importlib
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import round_5
+from backtester.engine import Backtester
+from benchmarks.latency import synthetic_ticks
+
+TICKS = list(synthetic_ticks(300, seed=5))
+
+
+class ColdStartTrader:
+    """
+    Trader replaced by a fresh instance of a reloaded module at given ticks, as the platform may do at any
+    timestamp, so its data can only come back from traderData
+    """
+    def __init__(self, cold_ticks):
+        self.cold_ticks = set(cold_ticks)
+        self.tick = 0
+        self.restored = []  # ticks where the trader decoded traderData
+        self.orders = []  # orders of every tick in comparable form
+        self.trader = self.fresh()
+
+    def fresh(self):
+        trader = importlib.reload(round_5).Trader()
+        persistence = trader.persistence
+        restore = persistence.restore
+
+        def recorded_restore(encoded, data):
+            decoded = restore(encoded, data)
+            if decoded:
+                self.restored.append(self.tick)
+            return decoded
+        persistence.restore = recorded_restore
+        return trader
+
+    def run(self, state):
+        if self.tick in self.cold_ticks:
+            self.trader = self.fresh()
+        orders, conversions, trader_data = self.trader.run(state)
+        self.orders.append((sorted((symbol, [(o.price, o.quantity) for o in symbol_orders])
+                                   for symbol, symbol_orders in orders.items()), conversions))
+        self.tick += 1
+        return orders, conversions, trader_data
+
+
+def replay(cold_ticks):
+    trader = ColdStartTrader(cold_ticks)
+    result = Backtester(lambda: trader).run_stream([(0, TICKS)])
+    return trader, result
+
+
+@pytest.fixture(scope='module')
+def warm():
+    return replay([])
+
+
+def test_cold_starts_mid_run_trade_like_a_warm_trader(warm):
+    rng = random.Random(0)
+    cold_ticks = sorted(rng.sample(range(1, len(TICKS)), 60))
+    cold, result = replay(cold_ticks)
+    assert warm[0].restored == []  # warm trader never decodes traderData
+    assert cold.restored == cold_ticks  # every cold start rebuilt data from traderData
+    assert cold.orders == warm[0].orders
+    assert result.total_pnl == warm[1].total_pnl
+
+
+@pytest.mark.parametrize('tick', [1, 20, 21, 39, 150])
+def test_cold_start_on_and_between_snapshots(warm, tick):
+    # a snapshot is taken every 20 appends, so these restore from a fresh snapshot or from snapshot and appends
+    cold, _ = replay([tick])
+    assert cold.restored == [tick]
+    assert cold.orders == warm[0].orders
+
+
+def test_warm_instance_skips_decoding_and_stale_instance_decodes():
+    persistence = round_5.DeltaPersistence(round_5.BinaryCodec(), snapshot_interval=3)
+    data = {'S': round_5.RollingMoments()}
+    for value in range(5):
+        persistence.push(data['S'], float(value), 4)
+        persistence.record('S', float(value), 4)
+        encoded = persistence.encode(data)
+    assert not persistence.restore(encoded, data)  # sequence numbers match the instance
+
+    stale = round_5.DeltaPersistence(round_5.BinaryCodec(), snapshot_interval=3)
+    restored = {'S': round_5.RollingMoments()}
+    assert stale.restore(encoded, restored)
+    assert list(restored['S']) == [1.0, 2.0, 3.0, 4.0]
+    assert (restored['S'].mean, restored['S'].m2) == pytest.approx((data['S'].mean, data['S'].m2))
+    assert stale.seq == persistence.seq
+    assert stale.encode(restored) == encoded  # appends continue on top of the restored snapshot
@@ -0,0 +1,35 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.profiler import SUB_BITS, SpanProfiler
+
+
+def test_buckets_contain_their_durations():
+    rng = random.Random(0)
+    for elapsed in list(range(100)) + [rng.randrange(1 << 40) for _ in range(1000)]:
+        low, high = SpanProfiler.bucket_bounds(SpanProfiler.bucket(elapsed))
+        assert low <= elapsed < high
+
+
+@pytest.mark.parametrize('q', [0.5, 0.9, 0.99])
+def test_percentile_is_within_a_bucket_width(q):
+    rng = random.Random(1)
+    durations = sorted(int(rng.lognormvariate(11.8, 0.3)) for _ in range(5000))
+    profiler = SpanProfiler()
+    for elapsed in durations:
+        profiler.record('Logger.serialize', elapsed, elapsed)
+    exact = durations[round(q * len(durations)) - 1]
+    assert profiler.percentile('Logger.serialize', q) == pytest.approx(exact, rel=1 / (1 << SUB_BITS))
+
+
+def test_percentile_never_exceeds_longest_span():
+    profiler = SpanProfiler()
+    for elapsed in (1100, 1500, 0):
+        profiler.record('Trader.run', elapsed, elapsed)
+    assert profiler.percentile('Trader.run', 1.0) == 1500
+    assert profiler.percentile('Trader.run', 0.99) <= 1500
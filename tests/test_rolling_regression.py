@@ -0,0 +1,39 @@
+import os
+import statistics
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from round_5 import RollingRegression
+
+
+def rolling(ticks, values, max_size):
+    regression = RollingRegression()
+    for x, y in zip(ticks, values):
+        if len(regression) >= max_size:
+            regression.popleft()
+        regression.append(y, x)
+    return regression
+
+
+def test_skipped_ticks_keep_their_spacing():
+    ticks = [0, 1, 2, 4, 5, 8, 9]  # ticks 3, 6 and 7 were shed
+    values = [10.0, 11.0, 12.5, 14.0, 15.0, 18.2, 19.0]
+    slope, intercept = statistics.linear_regression(ticks[-5:], values[-5:])
+    assert rolling(ticks, values, 5).predict(1) == pytest.approx(slope * 10 + intercept)
+
+
+def test_default_ticks_follow_the_last_value():
+    regression = RollingRegression()
+    for y in [1.0, 2.0, 4.0]:
+        regression.append(y)
+    assert list(regression.xs) == [0, 1, 2]
+    regression.append(5.0, 10)
+    regression.append(6.0)
+    assert list(regression.xs) == [0, 1, 2, 10, 11]
+
+
+def test_single_value_predicts_flat():
+    assert rolling([7], [3.5], 5).predict(2) == 3.5
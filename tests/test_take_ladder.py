@@ -0,0 +1,106 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datamodel import *
+from round_5 import OTCArbitrage, Trader
+
+PRODUCT_CONFIG = Trader.config['PRODUCT']['ORCHIDS']
+STRATEGY_CONFIG = Trader.config['STRATEGY']['ORCHIDS']
+
+
+def brute_force_edge(prices, quantities, reference, direction, min_edge, headroom):
+    """
+    Best cumulative edge of any selection of units within headroom, taking units of highest edge first
+    """
+    units = sorted((direction * (reference - price) for price, quantity in zip(prices, quantities)
+                    for _ in range(abs(quantity))), reverse=True)
+    return sum(edge for edge in units[:headroom] if edge >= min_edge)
+
+
+def orchids_state(position, bids, asks, otc_bid=1110.0, otc_ask=1112.0):
+    """
+    State of ORCHIDS with a book of {price: quantity} per side and conversion observation with unit transport fee
+    """
+    order_depth = OrderDepth()
+    order_depth.buy_orders = dict(sorted(bids.items(), reverse=True))
+    order_depth.sell_orders = dict(sorted(asks.items()))
+    observation = ConversionObservation(otc_bid, otc_ask, 1.0, 0.0, 0.0, 2500.0, 80.0)
+    return TradingState('', 100, {'ORCHIDS': Listing('ORCHIDS', 'ORCHIDS', 'SEASHELLS')}, {'ORCHIDS': order_depth},
+                        {}, {}, {'ORCHIDS': position}, Observation({}, {'ORCHIDS': observation}))
+
+
+def test_deep_book_long():
+    takes, edge = OTCArbitrage.take_ladder([1101, 1102, 1103, 1105], [-10, -20, -30, -40], 1105.5, 1, 1.0, 100)
+    assert takes == [(1101, 10), (1102, 20), (1103, 30)]
+    assert edge == pytest.approx(4.5 * 10 + 3.5 * 20 + 2.5 * 30)
+
+
+def test_deep_book_headroom_splits_level():
+    takes, edge = OTCArbitrage.take_ladder([1101, 1102, 1103], [-10, -20, -30], 1105.5, 1, 1.0, 25)
+    assert takes == [(1101, 10), (1102, 15)]
+    assert edge == pytest.approx(4.5 * 10 + 3.5 * 15)
+
+
+def test_short_side_walks_bids_down():
+    takes, edge = OTCArbitrage.take_ladder([1100, 1099, 1097], [15, 5, 50], 1096.5, -1, 1.0, 100)
+    assert takes == [(1100, 15), (1099, 5)]
+    assert edge == pytest.approx(3.5 * 15 + 2.5 * 5)
+
+
+@pytest.mark.parametrize('headroom', [0, -5])
+def test_no_headroom_takes_nothing(headroom):
+    assert OTCArbitrage.take_ladder([1101], [-10], 1110.0, 1, 1.0, headroom) == ([], 0.0)
+
+
+def test_no_profitable_level_takes_nothing():
+    assert OTCArbitrage.take_ladder([1100, 1099], [10, 10], 1099.5, -1, 1.0, 100) == ([], 0.0)
+
+
+@pytest.mark.parametrize('direction', [1, -1])
+def test_matches_brute_force_optimum(direction):
+    rng = random.Random(direction)
+    for _ in range(500):
+        best = 1100 + rng.randint(-5, 5)
+        prices, price = [], best
+        for _ in range(rng.randint(1, 6)):
+            prices.append(price)
+            price += direction * rng.randint(1, 3)  # asks rise and bids fall deeper in the book
+        quantities = [-direction * rng.randint(1, 40) for _ in prices]
+        reference = best + direction * rng.uniform(-3, 8)
+        min_edge = rng.choice([0.5, 1.0, 2.0])
+        headroom = rng.randint(0, 120)
+
+        takes, edge = OTCArbitrage.take_ladder(prices, quantities, reference, direction, min_edge, headroom)
+        assert edge == pytest.approx(brute_force_edge(prices, quantities, reference, direction, min_edge, headroom))
+        assert sum(take for _, take in takes) <= max(headroom, 0)
+        assert all(take > 0 for _, take in takes)
+        assert len({price for price, _ in takes}) == len(takes)
+
+
+def test_long_headroom_from_expected_position():
+    state = orchids_state(90, {1099: 20}, {1101: -8, 1102: -8, 1103: -8})
+    arbitrage = OTCArbitrage(state, PRODUCT_CONFIG, STRATEGY_CONFIG)
+    arbitrage.arbitrage_exchange_enter()
+    assert [(o.price, o.quantity) for o in arbitrage.orders] == [(1101, 8), (1102, 2)]
+    assert arbitrage.expected_position == PRODUCT_CONFIG['POSITION_LIMIT']
+
+
+def test_short_headroom_from_expected_position():
+    state = orchids_state(-95, {1120: 3, 1119: 10}, {1125: -20}, otc_bid=1100.0, otc_ask=1102.0)
+    arbitrage = OTCArbitrage(state, PRODUCT_CONFIG, STRATEGY_CONFIG)
+    arbitrage.arbitrage_exchange_enter()
+    assert [(o.price, o.quantity) for o in arbitrage.orders] == [(1120, -3), (1119, -2)]
+    assert arbitrage.expected_position == -PRODUCT_CONFIG['POSITION_LIMIT']
+
+
+def test_headroom_exhausted_by_expected_position():
+    state = orchids_state(0, {1099: 20}, {1101: -8, 1102: -8})
+    arbitrage = OTCArbitrage(state, PRODUCT_CONFIG, STRATEGY_CONFIG)
+    arbitrage.expected_position = PRODUCT_CONFIG['POSITION_LIMIT']  # filled by an earlier sub-strategy
+    arbitrage.arbitrage_exchange_enter()
+    assert arbitrage.orders == []